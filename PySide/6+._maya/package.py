@@ -1,3 +1,4 @@
+import lockfiles
 import maya_packaging
 
 
@@ -61,11 +62,14 @@ def _version() -> str:
     Returns:
         The version.
     """
-    return maya_packaging.get_PySide_version(cached_bin_path=__maya_package._bin_path)
+    return maya_packaging.get_PySide_version(cached_bin_path=__maya_bin_path)
 
 
-__maya_package = maya_packaging.latest_existing_package()
-__python_version = maya_packaging.get_python_version(
-    cached_bin_path=__maya_package._bin_path
+__maya_bin_path = lockfiles.get(
+    "__maya_bin_path", lambda: maya_packaging.latest_existing_package()._bin_path
 )
-__version = _version()
+__python_version = lockfiles.get(
+    "__python_version",
+    lambda: maya_packaging.get_python_version(cached_bin_path=__maya_bin_path),
+)
+__version = lockfiles.get("__version", _version)
@@ -1,4 +1,6 @@
+import lockfiles
 import maya_packaging
+import tool_discovery
 
 
 name = "PySide2"
@@ -31,15 +33,7 @@ def requires():
 
 @early()
 def tools():
-    import pathlib
-
-    tools = []
-
-    for child in pathlib.Path(__maya_package._bin_path).iterdir():
-        if child.stem.startswith("pyside"):
-            tools.append(child.stem)
-
-    return tools
+    return lockfiles.get("tools", _tools)
 
 
 uuid = "recipes.PySide2"
@@ -68,6 +62,24 @@ def version():
 _native = True
 
 
+def _tools() -> list[str]:
+    """Determines the PySide2 tools in Maya's bin path.
+
+    Returns:
+        The tool names.
+    """
+    import pathlib
+
+    tools = []
+
+    for file_name in sorted(tool_discovery.list_files(__maya_bin_path)):
+        stem = pathlib.PurePath(file_name).stem
+        if stem.startswith("pyside"):
+            tools.append(stem)
+
+    return tools
+
+
 def _version() -> str:
     """Determines the version of Maya's internal PySide2 installation.
 
@@ -75,12 +87,15 @@ def _version() -> str:
         The version.
     """
     return maya_packaging.get_PySide_version(
-        PySide_module="PySide2", cached_bin_path=__maya_package._bin_path
+        PySide_module="PySide2", cached_bin_path=__maya_bin_path
     )
 
 
-__maya_package = maya_packaging.latest_existing_package()
-__python_version = maya_packaging.get_python_version(
-    cached_bin_path=__maya_package._bin_path
+__maya_bin_path = lockfiles.get(
+    "__maya_bin_path", lambda: maya_packaging.latest_existing_package()._bin_path
+)
+__python_version = lockfiles.get(
+    "__python_version",
+    lambda: maya_packaging.get_python_version(cached_bin_path=__maya_bin_path),
 )
-__version = _version()
+__version = lockfiles.get("__version", _version)
@@ -1,3 +1,8 @@
+import lockfiles
+import pacman
+import python_packaging
+
+
 name = "PySide2"
 
 
@@ -33,15 +38,12 @@ uuid = "recipes.PySide2"
 
 @early()
 def variants():
-    from rez.package_py_utils import find_site_python
-
-    python_pkg = find_site_python("PySide2")
     return [
         [
             "platform-**",
             "arch-**",
             "os-**",
-            f"python-{python_pkg.version.rpartition('.')[0]}",
+            f"python-{this.__python_version.rpartition('.')[0]}",
         ]
     ]
 
@@ -58,36 +60,36 @@ _native = True
 def _cmake_path() -> str | None:
     """Determines PySide2's CMake module path.
 
+    Returns:
+        The path, if found.
+    """
+    return lockfiles.get("_cmake_path", _find_cmake_path)
+
+
+def _find_cmake_path() -> str | None:
+    """Searches pacman's file list for PySide2's CMake module path.
+
     Returns:
         The path, if found.
     """
     import pathlib
-    from rez.package_py_utils import exec_command
-
-    try:
-        out, err = exec_command(
-            "_cmake_path", ["pacman", "--query", "--list", "pyside2"]
-        )
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("PySide2Config.cmake"):
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
+
+    for path in pacman.list_files("pyside2") or []:
+        if path.endswith("PySide2Config.cmake"):
+            return str(pathlib.Path(path).parent)
 
     return None
 
 
-def _version() -> str:
-    """Determines PySide2's version string.
+def _find_site_module() -> tuple[str, str]:
+    """Determines PySide2's version and the version of the Python installation it is
+    installed for.
 
     Returns:
-        The version.
+        The Python version and PySide2's version.
     """
-    from rez.package_py_utils import exec_python
-
-    return exec_python("version", ["import PySide2", "print(PySide2.__version__)"])
+    python_package, version_ = python_packaging.find_site_module("PySide2")
+    return str(python_package.version).partition("-")[0], version_
 
 
-__version = _version()
+__python_version, __version = lockfiles.get("site_module", _find_site_module)
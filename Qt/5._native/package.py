@@ -1,3 +1,10 @@
+import lockfiles
+import pacman
+import qt_packaging
+import subprocesses
+import tool_discovery
+
+
 name = "Qt"
 
 
@@ -29,7 +36,6 @@ variants = [["platform-**", "arch-**", "os-**"]]
 
 @early()
 def tools():
-    import pathlib
     from rez.system import system
 
     potential_tools = [
@@ -143,22 +149,25 @@ def tools():
         "xmlpatternsvalidator.debug",
     ]
 
-    bin_path = pathlib.Path(_bin_path())
     suffix = ".exe" if system.platform == "windows" else ""
+    qualified_tools = [
+        tool + qualifier for tool in potential_tools for qualifier in ("", "-qt5")
+    ]
 
-    tools_ = []
-    for tool in potential_tools:
-        for qualifier in ("", "-qt5"):
-            test_path = bin_path.joinpath(tool + qualifier + suffix)
-            if test_path.is_file():
-                tools_.append(tool + qualifier + suffix)
-
-    return tools_
+    return lockfiles.get(
+        "tools",
+        lambda: [
+            tool + suffix
+            for tool in tool_discovery.find_tools(_bin_path(), qualified_tools, suffix)
+        ],
+    )
 
 
 @early()
 def version():
-    version_ = _get_version_from_pacman()
+    version_ = lockfiles.get(
+        "__version", lambda: _get_version_from_files() or _get_version_from_pacman()
+    )
 
     if not version_:
         from rez.exceptions import InvalidPackageError
@@ -191,23 +200,23 @@ def _bin_path() -> str:
 def _cmake_path() -> str | None:
     """Determines Qt5's CMake module path.
 
+    Returns:
+        The path, if found.
+    """
+    return lockfiles.get("_cmake_path", _find_cmake_path)
+
+
+def _find_cmake_path() -> str | None:
+    """Searches pacman's file list for Qt5's CMake module path.
+
     Returns:
         The path, if found.
     """
     import pathlib
-    from rez.package_py_utils import exec_command
 
-    try:
-        out, err = exec_command(
-            "_cmake_path", ["pacman", "--query", "--list", "qt5-base"]
-        )
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("Qt5Config.cmake"):
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
+    for path in pacman.list_files("qt5-base") or []:
+        if path.endswith("Qt5Config.cmake"):
+            return str(pathlib.Path(path).parent)
 
     return None
 
@@ -219,23 +228,30 @@ def _get_bin_path_from_pacman() -> str | None:
         The path, if found.
     """
     import pathlib
-    from rez.package_py_utils import exec_command
 
-    try:
-        out, err = exec_command(
-            "_cmake_path", ["pacman", "--query", "--list", "qt5-base"]
-        )
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("qmake-qt5"):
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
+    for path in pacman.list_files("qt5-base") or []:
+        if path.endswith("qmake-qt5"):
+            return str(pathlib.Path(path).parent)
 
     return None
 
 
+def _get_version_from_files() -> str | None:
+    """Determines Qt5's version from its installed headers, CMake files or core
+    library, without running any processes once pacman's file list is cached.
+
+    Returns:
+        The version, if found.
+    """
+    import pathlib
+
+    bin_path = _get_bin_path_from_pacman()
+    if not bin_path:
+        return None
+
+    return qt_packaging.read_Qt_version(pathlib.Path(bin_path).parent, major=5)
+
+
 def _get_version_from_pacman() -> str | None:
     """Determines Qt5's version from the pacman package manager.
 
@@ -243,10 +259,11 @@ def _get_version_from_pacman() -> str | None:
         The version, if found.
     """
     import re
-    from rez.package_py_utils import exec_command
 
     try:
-        out, err = exec_command("version", ["pacman", "--query", "--info", "qt5-base"])
+        out, err = subprocesses.exec_command(
+            "version", ["pacman", "--query", "--info", "qt5-base"]
+        )
     except FileNotFoundError:
         pass
     else:
@@ -1,4 +1,6 @@
+import lockfiles
 import maya_packaging
+import tool_discovery
 
 
 name = "Qt"
@@ -42,7 +44,10 @@ tools = [
 
 @early()
 def version():
-    version_ = maya_packaging.get_Qt_version(cached_bin_path=__maya_bin_path)
+    version_ = lockfiles.get(
+        "__Qt_version",
+        lambda: maya_packaging.get_Qt_version(cached_bin_path=__maya_bin_path),
+    )
     return version_ + "-_maya"
 
 
@@ -53,16 +58,28 @@ _native = True
 def _cmake_archive_path() -> str:
     """Determines the location of the tarballed Qt5 CMake files.
 
+    Returns:
+        The path, if found.
+    """
+    return lockfiles.get("_cmake_archive_path", _find_cmake_archive_path)
+
+
+def _find_cmake_archive_path() -> str:
+    """Searches Maya's installation for the tarballed Qt5 CMake files.
+
     Returns:
         The path, if found.
     """
     import pathlib
 
+    # List the directory once rather than globbing it for each archive format
     cmake_path = pathlib.Path(__maya_bin_path).parent.joinpath("cmake")
-    archive_path = str(next(cmake_path.glob("*.tar.gz"), ""))
-    if not archive_path:
-        archive_path = str(next(cmake_path.glob("*.zip"), ""))
-    return archive_path
+    file_names = sorted(tool_discovery.list_files(cmake_path))
+    for extension in (".tar.gz", ".zip"):
+        for file_name in file_names:
+            if file_name.endswith(extension):
+                return str(cmake_path.joinpath(file_name))
+    return ""
 
 
-__maya_bin_path = maya_packaging.get_bin_path()
+__maya_bin_path = lockfiles.get("__maya_bin_path", maya_packaging.get_bin_path)
@@ -3,7 +3,9 @@ SHAPES_DOWNLOAD CMake variable.
 """
 import typing
 
+import lockfiles
 import maya_packaging
+import zip_bundles
 
 
 name = "SHAPES"
@@ -14,6 +16,8 @@ authors = ["Robert Zhou"]
 
 def commands():
     env.MAYA_MODULE_PATH.append("{root}")
+    if this._zip_bundle:
+        env.PYTHONPATH.append("{root}/python.zip")
 
 
 description = "The versatile blend shape editor for Autodesk Maya"
@@ -38,7 +42,7 @@ def variants():
             "platform-**",
             "arch-**",
             "maya-*",
-            f"python-{this.__python_version.rpartition('.')[0]}",
+            maya_packaging.get_python_requirement(this.__python_version),
         ]
     ]
 
@@ -47,15 +51,29 @@ def variants():
 def version():
     from rez.exceptions import InvalidPackageError
 
-    version = _find_version_from_build()
-    if not version:
-        version = _find_version_from_args()
+    download_path = this.__selected_download
+    version = lockfiles.get(
+        "__version",
+        lambda: _find_version_from_build()
+        or _find_version_from_download(download_path),
+        download_path,
+    )
     if version:
         return version
 
     raise InvalidPackageError("Could not find a version number to use from versions.md")
 
 
+@early()
+def _zip_bundle() -> bool:
+    """Caches whether the Python modules were bundled into a zip when building.
+
+    Returns:
+        True if the Python modules are bundled.
+    """
+    return zip_bundles.enabled()
+
+
 def _extract_version_from_md(md_file: typing.IO) -> str | None:
     """Searches the versions.md file for the first version string it can find.
 
@@ -74,24 +92,15 @@ def _extract_version_from_md(md_file: typing.IO) -> str | None:
     return None
 
 
-def _find_version_from_args() -> str | None:
-    """Searches the arguments to rez-build for the SHAPES download to extract and search
-    for version information.
+def _find_version_from_download(download_path: str | None) -> str | None:
+    """Searches the SHAPES download for version information.
+
+    Args:
+        download_path: The SHAPES zip file, if given.
 
     Returns:
         The version, if found.
     """
-    import pathlib
-    import re
-    import sys
-
-    download_path = ""
-    variable_pattern = re.compile(r"-DSHAPES_DOWNLOAD(:\w+)?=(.*)")
-    for arg in sys.argv:
-        match = variable_pattern.search(arg)
-        if match:
-            download_path = match.group(2) or download_path
-
     if download_path:
         from zipfile import ZipFile
 
@@ -123,4 +132,25 @@ def _find_version_from_build() -> str | None:
     return None
 
 
-__python_version = maya_packaging.get_python_version()
+def __select_download() -> str | None:
+    """Searches the arguments to rez-build for the SHAPES download, which is given with
+    the SHAPES_DOWNLOAD CMake variable.
+
+    Returns:
+        The path of the download, if given.
+    """
+    import re
+    import sys
+
+    download_path = None
+    variable_pattern = re.compile(r"-DSHAPES_DOWNLOAD(:\w+)?=(.*)")
+    for arg in sys.argv:
+        match = variable_pattern.search(arg)
+        if match:
+            download_path = match.group(2) or download_path
+
+    return download_path
+
+
+__selected_download = __select_download()
+__python_version = lockfiles.get("__python_version", maya_packaging.get_python_version)
@@ -0,0 +1,56 @@
+# Downloads a vendor archive into the recipe cache while verifying its SHA-256
+# digest, which is faster than FetchContent's download for large archives and is
+# shared between the variants of a package, see downloads.py for the details.
+#
+# The expected digest is passed with SHA256, or otherwise read from
+# -DFETCH_SHA256=<digest> or the FETCH_SHA256 environment variable. It is
+# required for URLs, and local paths are only verified when it is given.
+#
+# Usage, followed by FetchContent to unpack the verified archive:
+#
+# include("${CMAKE_SOURCE_DIR}/../../build_common/Download.cmake")
+# recipe_download(zip "$ENV{FETCH_URL}")
+#
+# FetchContent_Declare(mgear URL "${zip}" URL_HASH "SHA256=${zip_SHA256}")
+#
+# The download runs with the host's Python 3.10 or later, rather than
+# $ENV{PYTHON_EXE}, which may be an older interpreter such as mayapy.
+
+find_package(Python3 3.10 REQUIRED COMPONENTS Interpreter)
+
+if(NOT DEFINED FETCH_SHA256)
+  set(FETCH_SHA256 "$ENV{FETCH_SHA256}")
+endif()
+
+set(DOWNLOAD_SCRIPT "${CMAKE_CURRENT_LIST_DIR}/downloads.py")
+
+# Sets the variable to the path of the downloaded archive and <variable>_SHA256
+# to its digest
+function(recipe_download variable url)
+  cmake_parse_arguments(PARSE_ARGV 2 arg "" "SHA256" "")
+  if(NOT DEFINED arg_SHA256)
+    set(arg_SHA256 "${FETCH_SHA256}")
+  endif()
+
+  message(STATUS "Downloading ${url}")
+  execute_process(
+    COMMAND "${Python3_EXECUTABLE}" "${DOWNLOAD_SCRIPT}" "${url}" --sha256
+            "${arg_SHA256}"
+    OUTPUT_VARIABLE output
+    OUTPUT_STRIP_TRAILING_WHITESPACE
+    RESULT_VARIABLE result)
+  if(NOT result EQUAL 0)
+    message(FATAL_ERROR "Could not download and verify ${url}")
+  endif()
+
+  string(REPLACE "\n" ";" output "${output}")
+  list(GET output 0 path)
+  list(GET output 1 digest)
+  file(TO_CMAKE_PATH "${path}" path)
+  set(${variable}
+      "${path}"
+      PARENT_SCOPE)
+  set(${variable}_SHA256
+      "${digest}"
+      PARENT_SCOPE)
+endfunction()
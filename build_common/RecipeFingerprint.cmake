@@ -0,0 +1,72 @@
+# Skips rebuilding a variant when none of its inputs have changed since it was
+# last installed.
+#
+# The fingerprint covers the recipe's package.py and CMakeLists.txt, the
+# variant's resolved requirements, the package version and any extra files (e.g.
+# downloaded archives) or strings (e.g. download URLs) that the recipe provides.
+# It is stored in the installed variant, so an up-to-date variant can be
+# detected before anything is fetched or built.
+#
+# Usage, near the top of a recipe's CMakeLists.txt:
+#
+# include("${CMAKE_SOURCE_DIR}/../../build_common/RecipeFingerprint.cmake")
+# recipe_skip_if_unchanged(FILES ${archive} STRINGS $ENV{FETCH_URL})
+#
+# and as the last install step:
+#
+# recipe_install_fingerprint()
+#
+# Set the REZ_RECIPES_FORCE_REBUILD environment variable to always rebuild.
+
+set(RECIPE_FINGERPRINT_FILE "${CMAKE_INSTALL_PREFIX}/.rez-recipes-fingerprint")
+
+function(recipe_fingerprint out_var)
+  cmake_parse_arguments(PARSE_ARGV 1 arg "" "" "FILES;STRINGS")
+
+  set(inputs
+      "version=$ENV{REZ_BUILD_PROJECT_VERSION}"
+      "variant=$ENV{REZ_BUILD_VARIANT_REQUIRES}"
+      "resolve=$ENV{REZ_USED_RESOLVE}")
+  foreach(file_path "${CMAKE_SOURCE_DIR}/package.py"
+                    "${CMAKE_SOURCE_DIR}/CMakeLists.txt" ${arg_FILES})
+    if(EXISTS "${file_path}")
+      file(SHA256 "${file_path}" file_digest)
+    else()
+      set(file_digest "missing")
+    endif()
+    get_filename_component(file_name "${file_path}" NAME)
+    list(APPEND inputs "${file_name}=${file_digest}")
+  endforeach()
+  list(APPEND inputs ${arg_STRINGS})
+
+  string(SHA256 fingerprint "${inputs}")
+  set(${out_var}
+      ${fingerprint}
+      PARENT_SCOPE)
+endfunction()
+
+# Returns from the calling CMakeLists.txt when the installed variant is
+# up-to-date
+macro(recipe_skip_if_unchanged)
+  recipe_fingerprint(RECIPE_FINGERPRINT ${ARGN})
+
+  if(EXISTS "${RECIPE_FINGERPRINT_FILE}" AND NOT DEFINED
+                                             ENV{REZ_RECIPES_FORCE_REBUILD})
+    file(READ "${RECIPE_FINGERPRINT_FILE}" installed_fingerprint)
+    string(STRIP "${installed_fingerprint}" installed_fingerprint)
+    if(installed_fingerprint STREQUAL RECIPE_FINGERPRINT)
+      message(
+        NOTICE
+        "Inputs are unchanged, skipping the build of: ${CMAKE_INSTALL_PREFIX}")
+      # An install rule is still needed for the install target to exist
+      install(CODE "message(STATUS \"Up-to-date: ${CMAKE_INSTALL_PREFIX}\")")
+      return()
+    endif()
+  endif()
+endmacro()
+
+# Records the fingerprint once everything else has been installed
+function(recipe_install_fingerprint)
+  install(
+    CODE "file(WRITE \"${RECIPE_FINGERPRINT_FILE}\" \"${RECIPE_FINGERPRINT}\")")
+endfunction()
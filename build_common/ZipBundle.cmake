@@ -0,0 +1,41 @@
+# Optionally moves the pure-Python modules and packages of an installed variant
+# into a single zip, which is faster to import from network storage. Packages
+# containing resources or native extensions are left on disk, see zip_bundles.py
+# for the details.
+#
+# Bundling is enabled by passing -DREZ_RECIPES_ZIP_BUNDLE=ON to rez-build, or by
+# setting the REZ_RECIPES_ZIP_BUNDLE environment variable. The recipe's
+# package.py adds the bundle to PYTHONPATH using zip_bundles.enabled().
+#
+# Usage, after the Python files have been installed and before
+# recipe_install_fingerprint():
+#
+# include("${CMAKE_SOURCE_DIR}/../../build_common/ZipBundle.cmake")
+# recipe_install_zip_bundle("${CMAKE_INSTALL_PREFIX}/scripts")
+#
+# The bundle is written with $ENV{PYTHON_EXE}, which must be the interpreter
+# that will import it.
+
+if(NOT DEFINED REZ_RECIPES_ZIP_BUNDLE)
+  set(REZ_RECIPES_ZIP_BUNDLE "$ENV{REZ_RECIPES_ZIP_BUNDLE}")
+endif()
+
+set(ZIP_BUNDLE_SCRIPT "${CMAKE_CURRENT_LIST_DIR}/zip_bundles.py")
+
+# Installs a bundle of the modules found at the top level of the given installed
+# directories
+function(recipe_install_zip_bundle)
+  if(NOT REZ_RECIPES_ZIP_BUNDLE)
+    return()
+  endif()
+
+  set(bundle "${CMAKE_INSTALL_PREFIX}/python.zip")
+  list(TRANSFORM ARGN PREPEND "\"")
+  list(TRANSFORM ARGN APPEND "\"")
+  list(JOIN ARGN " " sources)
+  install(
+    CODE "execute_process(COMMAND \"$ENV{PYTHON_EXE}\" \"${ZIP_BUNDLE_SCRIPT}\" \"${bundle}\" ${sources} RESULT_VARIABLE result)
+    if(NOT result EQUAL 0)
+      message(FATAL_ERROR \"Could not bundle the Python modules into ${bundle}\")
+    endif()")
+endfunction()
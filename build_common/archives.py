@@ -0,0 +1,258 @@
+"""Extraction of vendor archives directly into an installation directory.
+
+Archives are streamed into a staging directory in a single pass and then moved into
+place, so the destination never contains a partial payload. A marker recording the
+archive's fingerprint and digest is written into the payload, which allows later
+installs of the same archive to be skipped.
+
+This module only depends on the standard library so that it can be run during a build
+with the host's Python 3.10 or later::
+
+    python archives.py ARCHIVE DESTINATION
+"""
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tarfile
+import zipfile
+
+import locks
+
+
+# The file recording which archive was extracted into a destination
+MARKER_NAME = ".rez-recipes-archive.json"
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def extract(archive: str | os.PathLike, destination: str | os.PathLike) -> bool:
+    """Extracts a ``.tar.*`` or ``.zip`` archive into a directory. Like CMake's
+    FetchContent, a single top-level directory in the archive is stripped.
+
+    Args:
+        archive: The archive to extract.
+        destination: The directory to extract into, which is replaced entirely.
+
+    Raises:
+        ValueError: When the archive contains members outside of the destination.
+
+    Returns:
+        True if the archive was extracted, or False if the destination already
+        contains the same archive's payload.
+    """
+    archive = pathlib.Path(archive)
+    destination = pathlib.Path(destination)
+
+    # Concurrent builds of the same destination wait for each other, after which all
+    # but the first find the payload up-to-date
+    with locks.locked(destination):
+        return _extract_locked(archive, destination)
+
+
+def digest(path: str | os.PathLike) -> str:
+    """Computes the SHA-256 digest of a file.
+
+    Args:
+        path: The file to hash.
+
+    Returns:
+        The hexadecimal digest.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as file_:
+        for chunk in iter(lambda: file_.read(_CHUNK_SIZE), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _extract_locked(archive: pathlib.Path, destination: pathlib.Path) -> bool:
+    """Extracts an archive while holding the destination's lock.
+
+    Args:
+        archive: The archive to extract.
+        destination: The directory to extract into, which is replaced entirely.
+
+    Raises:
+        ValueError: When the archive contains members outside of the destination.
+
+    Returns:
+        True if the archive was extracted, or False if the destination already
+        contains the same archive's payload.
+    """
+    marker = _read_marker(destination)
+    fingerprint = _fingerprint(archive)
+    if marker.get("fingerprint") == fingerprint:
+        return False
+
+    # The archive may have been touched or copied without changing its contents
+    if marker.get("sha256") and marker["sha256"] == digest(archive):
+        _write_marker(destination, fingerprint, marker["sha256"])
+        return False
+
+    staging = destination.with_name(destination.name + ".partial")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    if zipfile.is_zipfile(archive):
+        sha256 = _extract_zip(archive, staging)
+    else:
+        sha256 = _extract_tar(archive, staging)
+
+    # Strip a single top-level directory with renames rather than copies
+    children = list(staging.iterdir())
+    if len(children) == 1 and children[0].is_dir():
+        payload = staging.with_name(staging.name + ".payload")
+        shutil.rmtree(payload, ignore_errors=True)
+        children[0].rename(payload)
+        staging.rmdir()
+        payload.rename(staging)
+
+    shutil.rmtree(destination, ignore_errors=True)
+    staging.rename(destination)
+    _write_marker(destination, fingerprint, sha256)
+    return True
+
+
+class _HashingReader:
+    """Wraps a binary file so that everything read from it is also hashed."""
+
+    def __init__(self, file_):
+        self._file = file_
+        self.sha256 = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._file.read(size)
+        self.sha256.update(data)
+        return data
+
+
+def _check_member_path(staging: pathlib.Path, name: str) -> pathlib.Path:
+    """Resolves the path of an archive member, rejecting paths outside of staging.
+
+    Args:
+        staging: The directory being extracted into.
+        name: The member's name.
+
+    Raises:
+        ValueError: When the member would be written outside of staging.
+
+    Returns:
+        The path to write the member to.
+    """
+    path = staging.joinpath(name).resolve()
+    if not path.is_relative_to(staging.resolve()):
+        raise ValueError(f"Archive member is outside of the destination: {name}")
+    return path
+
+
+def _extract_tar(archive: pathlib.Path, staging: pathlib.Path) -> str:
+    """Extracts a tar archive by streaming through it once.
+
+    Args:
+        archive: The archive to extract.
+        staging: The directory to extract into.
+
+    Returns:
+        The SHA-256 digest of the archive.
+    """
+    with open(archive, "rb") as archive_file:
+        reader = _HashingReader(archive_file)
+        with tarfile.open(fileobj=reader, mode="r|*") as tar:
+            for member in tar:
+                _check_member_path(staging, member.name)
+                if member.issym():
+                    _check_member_path(
+                        staging,
+                        os.path.join(os.path.dirname(member.name), member.linkname),
+                    )
+                elif member.islnk():
+                    _check_member_path(staging, member.linkname)
+                if hasattr(tarfile, "data_filter"):
+                    tar.extract(member, staging, filter="data")
+                else:
+                    tar.extract(member, staging)
+        # Hash any trailing padding that the tar reader didn't need
+        while reader.read(_CHUNK_SIZE):
+            pass
+
+    return reader.sha256.hexdigest()
+
+
+def _extract_zip(archive: pathlib.Path, staging: pathlib.Path) -> str:
+    """Extracts a zip archive, writing each member directly to its destination.
+
+    Args:
+        archive: The archive to extract.
+        staging: The directory to extract into.
+
+    Returns:
+        The SHA-256 digest of the archive.
+    """
+    with zipfile.ZipFile(archive) as zip_file:
+        for member in zip_file.infolist():
+            path = _check_member_path(staging, member.filename)
+            if member.is_dir():
+                path.mkdir(parents=True, exist_ok=True)
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with zip_file.open(member) as source, open(path, "wb") as target:
+                shutil.copyfileobj(source, target, _CHUNK_SIZE)
+
+    # Zip files are read through their central directory, so hash them separately
+    return digest(archive)
+
+
+def _fingerprint(path: pathlib.Path) -> list:
+    """Generates a key that changes whenever a file is modified.
+
+    Args:
+        path: The file.
+
+    Returns:
+        The key.
+    """
+    stat = path.stat()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def _read_marker(destination: pathlib.Path) -> dict:
+    """Reads the marker recording which archive was extracted into a destination.
+
+    Args:
+        destination: The directory that was extracted into.
+
+    Returns:
+        The marker's contents, which are empty if there is no marker.
+    """
+    try:
+        with open(destination.joinpath(MARKER_NAME)) as marker_file:
+            return json.load(marker_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_marker(destination: pathlib.Path, fingerprint: list, sha256: str) -> None:
+    """Records which archive was extracted into a destination.
+
+    Args:
+        destination: The directory that was extracted into.
+        fingerprint: The archive's fingerprint.
+        sha256: The archive's digest.
+    """
+    with open(destination.joinpath(MARKER_NAME), "w") as marker_file:
+        json.dump({"fingerprint": fingerprint, "sha256": sha256}, marker_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("archive", help="The archive to extract")
+    parser.add_argument("destination", help="The directory to extract into")
+    args = parser.parse_args()
+
+    if extract(args.archive, args.destination):
+        print(f"Extracted {args.archive} to {args.destination}")
+    else:
+        print(f"Up-to-date: {args.destination}")
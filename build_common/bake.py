@@ -0,0 +1,314 @@
+"""Baking of named contexts into launchers that skip resolving on every launch.
+
+Launching a tool through ``rez-env`` resolves the request again and executes the
+``commands()`` of every package in the context. Baking resolves a request once and
+saves the variables that the context sets, such as ``PATH``, ``PYTHONPATH``,
+``MAYA_MODULE_PATH``, ``QT_PREFERRED_BINDING`` and ``PYTHON_EXE``, next to a launcher
+script in the ``contexts`` directory of the recipe cache. Variables that the context
+appends or prepends to keep a placeholder for their parent value, which the launcher
+fills in from the environment it is launched from, as ``rez-env`` would.
+
+The launcher only stats the package repositories, the families in the context and
+their versions' definitions to check that no package or variant has been added or
+removed since the context was baked, and bakes it again if one has::
+
+    python bake.py rigging maya mGear SHAPES ngSkinTools pymel
+    ~/.cache/rez-recipes/contexts/rigging/launch.py maya
+"""
+from collections.abc import Iterable
+import argparse
+import json
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import typing
+
+import locks
+import recipe_cache
+
+
+# The name of the launcher script written for each context
+LAUNCHER_NAME = "launch.py"
+
+# The name of the snapshot of each context's environment
+SNAPSHOT_NAME = "snapshot.json"
+
+# The version of the snapshot's layout
+SNAPSHOT_VERSION = 2
+
+# Stands for a variable's value in the launching environment in the baked environment
+_PARENT_PLACEHOLDER = "__REZ_RECIPES_PARENT_VALUE__"
+
+# The names of the package definitions that rez rewrites when it installs a variant
+_DEFINITION_NAMES = ("package.py", "package.yaml")
+
+_NAME_PATTERN = re.compile(r"[\w.-]+")
+
+_LAUNCHER_TEMPLATE = '''#!{python}
+"""Runs a command in the baked "{name}" context, baking it again when stale."""
+import sys
+
+sys.path.insert(0, {build_common!r})
+import bake
+
+
+if __name__ == "__main__":
+    sys.exit(bake.launch({name!r}, sys.argv[1:]))
+'''
+
+
+def bake(name: str, requests: Iterable[str]) -> pathlib.Path:
+    """Resolves a context and saves its environment and launcher.
+
+    Args:
+        name: The name of the context.
+        requests: The packages to request.
+
+    Raises:
+        ValueError: When the name cannot be used as a directory name.
+        ResolvedContextError: When the request cannot be resolved.
+
+    Returns:
+        The launcher.
+    """
+    from rez.config import config
+    from rez.exceptions import ResolvedContextError
+    from rez.resolved_context import ResolvedContext
+
+    requests = list(requests)
+    context_path = _context_path(name)
+
+    context = ResolvedContext(requests)
+    if not context.success:
+        raise ResolvedContextError(
+            f"Could not resolve {' '.join(requests)}: {context.failure_description}"
+        )
+
+    # Only keep the variables that the context sets, interpreted with a placeholder
+    # for their parent values, so that launching appends and prepends to the values of
+    # the launching environment rather than to the baker's. Variables without a
+    # parent value are interpreted without one, as rez may add separators otherwise.
+    environ = context.get_environ(parent_environ={})
+    parent_environ = dict(os.environ)
+    parent_environ.update(dict.fromkeys(environ, _PARENT_PLACEHOLDER))
+    parented_environ = context.get_environ(parent_environ=parent_environ)
+    environ = {
+        key: {"orphan": value, "parented": parented_environ.get(key, value)}
+        for key, value in environ.items()
+    }
+    rxt_path = str(context_path.joinpath("context.rxt"))
+    environ["REZ_RXT_FILE"] = {"orphan": rxt_path, "parented": rxt_path}
+
+    watched_paths = _watched_paths(
+        config.packages_path,
+        [variant.name for variant in context.resolved_packages],
+    )
+    snapshot = {
+        "snapshot_version": SNAPSHOT_VERSION,
+        "requests": requests,
+        "environ": environ,
+        "watched_paths": watched_paths,
+        "fingerprint": recipe_cache.fingerprint(watched_paths),
+    }
+
+    context_path.mkdir(parents=True, exist_ok=True)
+    context.save(rxt_path)
+    _write(context_path.joinpath(SNAPSHOT_NAME), json.dumps(snapshot, indent=4))
+
+    launcher_path = context_path.joinpath(LAUNCHER_NAME)
+    _write(
+        launcher_path,
+        _LAUNCHER_TEMPLATE.format(
+            python=sys.executable,
+            name=name,
+            build_common=os.path.dirname(os.path.abspath(__file__)),
+        ),
+    )
+    launcher_path.chmod(0o755)
+
+    return launcher_path
+
+
+def launch(name: str, command: list[str]) -> int:
+    """Runs a command in a baked context, baking it again first if any package has
+    been added to or removed from its families.
+
+    Args:
+        name: The name of the context.
+        command: The command and its arguments.
+
+    Raises:
+        FileNotFoundError: When no command is given, the context hasn't been baked or
+            the command cannot be found.
+
+    Returns:
+        The command's exit code.
+    """
+    if not command:
+        raise FileNotFoundError("No command given to launch")
+
+    snapshot = load(name)
+    if snapshot is None:
+        raise FileNotFoundError(f"The {name} context has not been baked")
+
+    if is_stale(snapshot):
+        # Only one launcher bakes the context again while the others wait for it
+        with locks.locked(_context_path(name).joinpath("bake")):
+            snapshot = load(name)
+            if is_stale(snapshot):
+                bake(name, snapshot["requests"])
+                snapshot = load(name)
+
+    environ = _apply(snapshot["environ"], os.environ)
+    executable = shutil.which(command[0], path=environ.get("PATH"))
+    if not executable:
+        raise FileNotFoundError(f"Could not find {command[0]} in the {name} context")
+
+    return subprocess.run([executable, *command[1:]], env=environ).returncode
+
+
+def load(name: str) -> dict[str, typing.Any] | None:
+    """Reads a baked context's snapshot.
+
+    Args:
+        name: The name of the context.
+
+    Raises:
+        ValueError: When the name cannot be used as a directory name.
+
+    Returns:
+        The snapshot, or None if the context hasn't been baked with this version.
+    """
+    try:
+        with open(_context_path(name).joinpath(SNAPSHOT_NAME)) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict) or (
+        snapshot.get("snapshot_version") != SNAPSHOT_VERSION
+    ):
+        return None
+    return snapshot
+
+
+def is_stale(snapshot: dict[str, typing.Any]) -> bool:
+    """Determines whether packages have been added to or removed from the repositories
+    since a context was baked, by comparing the modification times of the
+    repositories and of the families in the context.
+
+    Args:
+        snapshot: The baked context's snapshot.
+
+    Returns:
+        True if the context should be baked again.
+    """
+    return (
+        recipe_cache.fingerprint(snapshot["watched_paths"]) != snapshot["fingerprint"]
+    )
+
+
+def _apply(
+    baked_environ: dict[str, dict[str, str]], parent_environ: typing.Mapping[str, str]
+) -> dict[str, str]:
+    """Applies a baked context's variables to the environment it is launched from.
+
+    Args:
+        baked_environ: Each variable's value without a parent value, and its value
+            with a placeholder standing for the parent value.
+        parent_environ: The launching environment.
+
+    Returns:
+        The environment to launch the command in.
+    """
+    environ = dict(parent_environ)
+    for key, values in baked_environ.items():
+        if parent_environ.get(key):
+            environ[key] = values["parented"].replace(
+                _PARENT_PLACEHOLDER, parent_environ[key]
+            )
+        else:
+            environ[key] = values["orphan"]
+    return environ
+
+
+def _context_path(name: str) -> pathlib.Path:
+    """Determines the directory in which a baked context is stored.
+
+    Args:
+        name: The name of the context.
+
+    Raises:
+        ValueError: When the name cannot be used as a directory name.
+
+    Returns:
+        The path.
+    """
+    if not _NAME_PATTERN.fullmatch(name) or name in (".", ".."):
+        raise ValueError(f"Invalid context name: {name}")
+
+    return recipe_cache.cache_dir().joinpath("contexts", name)
+
+
+def _watched_paths(packages_path: Iterable[str], families: Iterable[str]) -> list[str]:
+    """Lists the paths that are modified when a package that could change a context's
+    resolve is added or removed.
+
+    Args:
+        packages_path: The package repositories.
+        families: The families of the packages in the context.
+
+    Returns:
+        The repositories, which change when a family is added, the families'
+        directories in each repository, which change when a version is added, and
+        each version's definition, which is rewritten when a variant is added.
+    """
+    paths = []
+    for repository in packages_path:
+        paths.append(repository)
+        for family in sorted(families):
+            family_path = os.path.join(repository, family)
+            paths.append(family_path)
+            try:
+                versions = sorted(
+                    entry.name for entry in os.scandir(family_path) if entry.is_dir()
+                )
+            except OSError:
+                continue
+            for version in versions:
+                for definition in _DEFINITION_NAMES:
+                    definition_path = os.path.join(family_path, version, definition)
+                    if os.path.isfile(definition_path):
+                        paths.append(definition_path)
+                        break
+    return paths
+
+
+def _write(path: pathlib.Path, text: str) -> None:
+    """Atomically replaces a file, so a launcher never reads a partial file.
+
+    Args:
+        path: The file to write.
+        text: The file's contents.
+    """
+    fd, temp_path = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as temp_file:
+            temp_file.write(text)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("name", help="The name of the context")
+    parser.add_argument("requests", nargs="+", help="The packages to request")
+    args = parser.parse_args()
+
+    print(bake(args.name, args.requests))
@@ -0,0 +1,146 @@
+"""Compares downloading an archive over one connection with downloading it in ranges
+over several connections, from a local HTTP server standing in for a vendor's server.
+
+The server limits each connection's throughput, as the round-trip time does on a
+high-latency link, and accepts range requests like the servers hosting the mGear and
+ngSkinTools releases. Each download goes into an empty recipe cache::
+
+    python benchmark_downloads.py [--size MB] [--rate MB/S] [--connections N]
+"""
+import argparse
+import functools
+import hashlib
+import http.server
+import os
+import re
+import tempfile
+import threading
+import time
+
+import downloads
+import recipe_cache
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Serves a single in-memory file, accepting range requests and limiting each
+    connection's throughput. Like a vendor's server, the whole file is sent instead of a
+    range when the request's ``If-Range`` doesn't match the file's ETag.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(
+        self, *args, data: bytes, rate: float, etag: str = '"benchmark"', **kwargs
+    ):
+        self.data = data
+        self.rate = rate
+        self.etag = etag
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        start, end = 0, len(self.data)
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if_range = self.headers.get("If-Range")
+        if match and (if_range is None or if_range == self.etag):
+            start = int(match.group(1))
+            end = min(end, int(match.group(2) or end - 1) + 1)
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{end - 1}/{len(self.data)}"
+            )
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start))
+        self.send_header("ETag", self.etag)
+        self.end_headers()
+
+        chunk_size = 64 * 1024
+        for offset in range(start, end, chunk_size):
+            chunk = self.data[offset : min(end, offset + chunk_size)]
+            try:
+                self.wfile.write(chunk)
+            except OSError:
+                return
+            time.sleep(len(chunk) / self.rate)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def benchmark(
+    size: int, rate: float, connections: list[int]
+) -> dict[int, dict[str, float]]:
+    """Downloads a random archive from a local server.
+
+    Args:
+        size: The size of the archive in bytes.
+        rate: The maximum throughput of each connection in bytes per second.
+        connections: The numbers of connections to download with.
+
+    Raises:
+        DownloadError: When an archive cannot be downloaded or doesn't match its
+            digest.
+
+    Returns:
+        The duration in seconds and throughput in bytes per second, keyed by the
+        number of connections.
+    """
+    data = os.urandom(size)
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    handler = functools.partial(RangeRequestHandler, data=data, rate=rate)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/archive.zip"
+
+    results = {}
+    previous_cache_dir = os.environ.get(recipe_cache.CACHE_DIR_ENV_VAR)
+    try:
+        for count in connections:
+            with tempfile.TemporaryDirectory() as cache_dir:
+                os.environ[recipe_cache.CACHE_DIR_ENV_VAR] = cache_dir
+                start = time.perf_counter()
+                downloads.download(url, sha256, count)
+                duration = time.perf_counter() - start
+            results[count] = {"duration": duration, "throughput": size / duration}
+    finally:
+        server.shutdown()
+        if previous_cache_dir is None:
+            os.environ.pop(recipe_cache.CACHE_DIR_ENV_VAR, None)
+        else:
+            os.environ[recipe_cache.CACHE_DIR_ENV_VAR] = previous_cache_dir
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument(
+        "--size", type=float, default=64, help="The size of the archive in MB"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=16,
+        help="The maximum throughput of each connection in MB/s",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        action="append",
+        help="A number of connections to download with",
+    )
+    args = parser.parse_args()
+
+    results = benchmark(
+        int(args.size * 1024 * 1024),
+        args.rate * 1024 * 1024,
+        args.connections or [1, downloads.CONNECTIONS],
+    )
+    print(f"{'Connections':<12} {'Duration':>10} {'Throughput':>12}")
+    for count, result in results.items():
+        print(
+            f"{count:<12} {result['duration']:>9.2f}s"
+            f" {result['throughput'] / 1024 / 1024:>8.1f}MB/s"
+        )
@@ -0,0 +1,337 @@
+"""Times rez's solver on a synthetic package repository shaped like the one built from
+these recipes.
+
+The repository contains many Maya years, each with several updates, along with the
+packages that provide Maya's internal Python, Qt and PySide, and many versions of the
+plug-in packages, which have a variant for each Maya year that they support. Newer
+plug-in versions drop support for older Maya years, as they do in practice, so solves
+for older years need to skip past the latest versions.
+
+The repository is written twice, once with the plug-ins' default requirements and once
+with the narrow requirements enabled by ``REZ_RECIPES_NARROW_REQUIREMENTS``, where
+plug-ins require Maya's exact internal Python package. Each solve runs with rez's
+resolve and package caches cleared, so the repository is loaded from disk every time::
+
+    python benchmark_solver.py [--years N] [--updates N] [--plugin-versions N]
+"""
+from collections.abc import Iterable
+import argparse
+import pathlib
+import statistics
+import tempfile
+import time
+
+
+# The Python, Qt and PySide versions in each Maya year, which later years extrapolate
+# from
+_MAYA_RUNTIMES = {
+    2018: ("2.7.11", "5.6.1", "PySide2", "5.6.1"),
+    2019: ("2.7.11", "5.6.1", "PySide2", "5.6.1"),
+    2020: ("2.7.11", "5.12.5", "PySide2", "5.12.5"),
+    2022: ("3.7.7", "5.15.2", "PySide2", "5.15.2"),
+    2023: ("3.9.7", "5.15.2", "PySide2", "5.15.2"),
+    2024: ("3.10.8", "5.15.2", "PySide2", "5.15.2"),
+    2025: ("3.11.4", "6.5.3", "PySide6", "6.5.3"),
+}
+
+# The solves to time, which are typical of artists' contexts
+REQUESTS = (
+    ("maya-2024", "mGear", "SHAPES"),
+    ("maya-2022", "mGear", "pymel", "ngSkinTools"),
+    ("maya", "mGear", "SHAPES", "ngSkinTools", "pymel"),
+    ("maya-2023", "mGear", "SHAPES"),
+)
+
+
+def make_repository(
+    path: str | pathlib.Path,
+    years: int = 12,
+    updates: int = 4,
+    plugin_versions: int = 30,
+    narrow: bool = False,
+) -> None:
+    """Writes a synthetic package repository.
+
+    Args:
+        path: The directory to write the repository to.
+        years: The number of Maya years.
+        updates: The number of updates released for each Maya year.
+        plugin_versions: The number of versions of each plug-in package.
+        narrow: Whether plug-ins require Maya's exact internal Python package, as
+            ``maya_packaging.get_python_requirement()`` does with narrow requirements.
+    """
+    from rez.system import system
+
+    path = pathlib.Path(path)
+    runtimes = _maya_runtimes(years)
+    platform_requires = [
+        f"platform-{system.platform}",
+        f"arch-{system.arch}",
+        f"os-{system.os}",
+    ]
+
+    for requirement in platform_requires:
+        name, _, version = requirement.partition("-")
+        _write_package(path, name, version)
+
+    internal_variants = {}
+    for year, (
+        python_version,
+        Qt_version,
+        PySide_module,
+        PySide_version,
+    ) in runtimes.items():
+        python_minor = python_version.rpartition(".")[0]
+        for update in range(updates):
+            maya_version = f"{year}.{update}.{year}0101{update:04d}-native"
+            _write_package(
+                path,
+                "maya",
+                maya_version,
+                requires=[
+                    f"~python-{python_version}-_maya",
+                    f"~Qt-{Qt_version}-_maya",
+                    f"~{PySide_module}-{PySide_version}-_maya",
+                ],
+                variants=[platform_requires],
+            )
+            maya_requires = [*platform_requires, f"maya-{maya_version}"]
+            for name, version, variant in (
+                ("python", python_version, maya_requires),
+                ("Qt", Qt_version, maya_requires),
+                (
+                    PySide_module,
+                    PySide_version,
+                    [*maya_requires, f"python-{python_minor}"],
+                ),
+            ):
+                internal_variants.setdefault((name, version), []).append(variant)
+
+    for (name, version), variants in internal_variants.items():
+        requires = [f"Qt-{version}"] if name.startswith("PySide") else []
+        _write_package(path, name, f"{version}-_maya", requires, variants)
+
+    python_minors = sorted(
+        {runtime[0].rpartition(".")[0] for runtime in runtimes.values()},
+        key=lambda version: tuple(map(int, version.split("."))),
+    )
+    for python_minor in python_minors:
+        for patch in range(updates):
+            _write_package(
+                path,
+                "python",
+                f"{python_minor}.{patch}-native",
+                variants=[platform_requires],
+            )
+
+    year_list = list(runtimes)
+    for index in range(plugin_versions):
+        # Each version supports a window of years that moves with its release
+        newest = min(len(year_list), 1 + index * len(year_list) // plugin_versions + 3)
+        supported = {
+            year: runtimes[year] for year in year_list[max(0, newest - 5) : newest]
+        }
+        python_requires = {
+            year: _python_requirement(runtime[0], narrow)
+            for year, runtime in supported.items()
+        }
+
+        _write_package(
+            path,
+            "pymel",
+            f"1.{index}.0",
+            requires=["maya-2020+"],
+            variants=[
+                [requirement] for requirement in sorted(set(python_requires.values()))
+            ],
+        )
+        _write_package(
+            path,
+            "mGear",
+            f"4.{index}.0",
+            requires=["maya-2018+", "pymel"],
+            variants=[
+                [
+                    *platform_requires[:2],
+                    f"maya-{year}",
+                    python_requires[year],
+                    runtime[2],
+                ]
+                for year, runtime in supported.items()
+            ],
+        )
+        _write_package(
+            path,
+            "SHAPES",
+            f"5.{index}.0",
+            requires=[f"maya-{min(supported)}+"],
+            variants=[
+                [
+                    *platform_requires[:2],
+                    f"maya-{year}",
+                    python_requires[year],
+                ]
+                for year in supported
+            ],
+        )
+        _write_package(
+            path,
+            "ngSkinTools",
+            f"2.{index}.0",
+            requires=[f"maya-{'|'.join(map(str, supported))}"],
+            variants=[
+                [
+                    platform_requires[0],
+                    f"maya-{year}",
+                    python_requires[year],
+                ]
+                for year in supported
+            ],
+        )
+
+
+def benchmark(
+    repository: str | pathlib.Path,
+    requests: Iterable[Iterable[str]] = REQUESTS,
+    repeat: int = 5,
+) -> dict[str, dict[str, float]]:
+    """Times solves against a repository.
+
+    Args:
+        repository: The package repository to solve against.
+        requests: The packages to request in each solve.
+        repeat: The number of times to run each solve.
+
+    Raises:
+        RuntimeError: When a request cannot be resolved.
+
+    Returns:
+        The median solve time in seconds and the number of packages loaded, keyed by
+        request.
+    """
+    from rez.config import config
+    from rez.package_repository import package_repository_manager
+    from rez.resolved_context import ResolvedContext
+
+    config.override("resolve_caching", False)
+    config.override("memcached_uri", [])
+
+    results = {}
+    for request in requests:
+        request = list(request)
+        durations = []
+        for _ in range(repeat):
+            package_repository_manager.clear_caches()
+            start = time.perf_counter()
+            context = ResolvedContext(request, package_paths=[str(repository)])
+            durations.append(time.perf_counter() - start)
+            if not context.success:
+                raise RuntimeError(
+                    f"Could not resolve {' '.join(request)}: "
+                    f"{context.failure_description}"
+                )
+
+        results[" ".join(request)] = {
+            "duration": statistics.median(durations),
+            "packages": context.num_loaded_packages,
+        }
+
+    return results
+
+
+def _maya_runtimes(years: int) -> dict[int, tuple[str, str, str, str]]:
+    """Lists the runtimes of the latest Maya years, extrapolating past the known
+    years.
+
+    Args:
+        years: The number of Maya years.
+
+    Returns:
+        The Python version, Qt version, PySide module and PySide version of each year.
+    """
+    runtimes = dict(_MAYA_RUNTIMES)
+    year = max(runtimes)
+    while len(runtimes) < years:
+        year += 1
+        python_minor = 11 + year - max(_MAYA_RUNTIMES)
+        Qt_version = f"6.{5 + year - max(_MAYA_RUNTIMES)}.3"
+        runtimes[year] = (f"3.{python_minor}.4", Qt_version, "PySide6", Qt_version)
+
+    return dict(list(runtimes.items())[-years:])
+
+
+def _python_requirement(python_version: str, narrow: bool) -> str:
+    """Formats a plug-in variant's requirement on Maya's internal Python installation.
+
+    Args:
+        python_version: The version of Maya's internal Python installation.
+        narrow: Whether to require Maya's exact internal Python package.
+
+    Returns:
+        The requirement.
+    """
+    if narrow:
+        return f"python-{python_version}-_maya"
+    return f"python-{python_version.rpartition('.')[0]}"
+
+
+def _write_package(
+    repository: pathlib.Path,
+    name: str,
+    version: str,
+    requires: list[str] | None = None,
+    variants: list[list[str]] | None = None,
+) -> None:
+    """Writes a package definition to a repository.
+
+    Args:
+        repository: The package repository.
+        name: The package's name.
+        version: The package's version.
+        requires: The package's requirements.
+        variants: The requirements of each of the package's variants.
+    """
+    package_path = repository.joinpath(name, version)
+    package_path.mkdir(parents=True, exist_ok=True)
+    with open(package_path.joinpath("package.py"), "w") as package_file:
+        package_file.write(f"name = {name!r}\nversion = {version!r}\n")
+        if requires:
+            package_file.write(f"requires = {requires!r}\n")
+        if variants:
+            package_file.write(f"variants = {variants!r}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument(
+        "--years", type=int, default=12, help="The number of Maya years"
+    )
+    parser.add_argument(
+        "--updates", type=int, default=4, help="The number of updates to each Maya year"
+    )
+    parser.add_argument(
+        "--plugin-versions",
+        type=int,
+        default=30,
+        help="The number of versions of each plug-in package",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5, help="The number of times to solve"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    for narrow in (False, True):
+        with tempfile.TemporaryDirectory() as repository:
+            make_repository(
+                repository, args.years, args.updates, args.plugin_versions, narrow
+            )
+            results[narrow] = benchmark(repository, repeat=args.repeat)
+
+    print(f"{'Request':<40} {'Default':>24} {'Narrow':>24}")
+    for request in results[False]:
+        columns = [
+            f"{result['duration'] * 1000:.1f}ms ({result['packages']} packages)"
+            for result in (results[False][request], results[True][request])
+        ]
+        print(f"{request:<40} {columns[0]:>24} {columns[1]:>24}")
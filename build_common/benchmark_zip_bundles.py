@@ -0,0 +1,227 @@
+"""Compares the import time of Python modules installed as directories with the same
+modules bundled into a zip by ``zip_bundles.py``.
+
+The source directories are copied into a temporary directory for each layout, so the
+installation being measured isn't modified. Each import runs in a fresh interpreter,
+which also counts the files and directories opened while importing through audit
+hooks. On network storage, each distinct path costs at least one round-trip, whereas
+reopening the same zip is mostly served from the client's cache.
+
+The copies are made inside the rez package repository that contains the first source,
+e.g. a released variant's ``site-packages`` on NFS, so the storage that packages are
+actually imported from is measured. ``--tmpdir`` measures elsewhere. Run the benchmark
+with the interpreter that will import the modules, e.g. mayapy::
+
+    python benchmark_zip_bundles.py --module pymel.core SOURCE [SOURCE ...]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import pathlib
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import zip_bundles
+
+
+# Imports the modules and reports the time taken, the number of files and directories
+# opened and the number of distinct paths among them
+_IMPORT_SCRIPT = """
+import importlib
+import json
+import sys
+import time
+
+accesses = 0
+paths = set()
+
+def count_accesses(event, args):
+    global accesses
+    if event in ("open", "os.listdir", "os.scandir"):
+        accesses += 1
+        paths.add(str(args[0]))
+
+sys.addaudithook(count_accesses)
+start = time.perf_counter()
+for module in sys.argv[1:]:
+    importlib.import_module(module)
+duration = time.perf_counter() - start
+print(json.dumps({"duration": duration, "accesses": accesses, "paths": len(paths)}))
+"""
+
+
+def benchmark(
+    sources: list[str | os.PathLike],
+    modules: list[str],
+    repeat: int = 10,
+    python: str = sys.executable,
+    tmpdir: str | None = None,
+) -> dict[str, dict[str, float]]:
+    """Measures the time taken to import modules from directories and from a bundle.
+
+    Args:
+        sources: The directories that the modules are installed in.
+        modules: The modules to import.
+        repeat: The number of fresh interpreters to import the modules in.
+        python: The interpreter to import the modules with.
+        tmpdir: The directory to copy the sources into. Defaults to the package
+            repository containing the first source.
+
+    Raises:
+        ValueError: When no directory is given and the first source isn't in a
+            package repository.
+        subprocess.CalledProcessError: When the modules cannot be imported.
+
+    Returns:
+        The median import time in seconds, number of filesystem accesses and number
+        of distinct paths accessed for each layout.
+    """
+    if tmpdir is None:
+        tmpdir = find_repository(sources[0])
+        if tmpdir is None:
+            raise ValueError(f"{sources[0]} isn't in a package repository")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix=".benchmark-", dir=tmpdir) as temp_dir:
+        for layout in ("directories", "bundle"):
+            layout_path = pathlib.Path(temp_dir, layout)
+            search_paths = []
+            for index, source in enumerate(sources):
+                source_copy = layout_path.joinpath(str(index))
+                shutil.copytree(source, source_copy)
+                search_paths.append(str(source_copy))
+
+            if layout == "bundle":
+                bundle_path = layout_path.joinpath(zip_bundles.BUNDLE_NAME)
+                subprocess.run(
+                    [python, zip_bundles.__file__, str(bundle_path), *search_paths],
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                )
+                search_paths.insert(0, str(bundle_path))
+            else:
+                # Compile the directories too, so only the layout is compared
+                subprocess.run(
+                    [python, "-m", "compileall", "-q", *search_paths], check=True
+                )
+
+            results[layout] = _measure(python, search_paths, modules, repeat)
+
+    return results
+
+
+def find_repository(path: str | os.PathLike) -> str | None:
+    """Finds the rez package repository that contains a path.
+
+    Args:
+        path: The path, such as an installed variant's ``site-packages``.
+
+    Returns:
+        The repository from rez's packages path, if any contains the path.
+    """
+    from rez.config import config
+
+    path = os.path.realpath(path)
+    for repository in config.packages_path:
+        repository = os.path.realpath(os.path.expanduser(repository))
+        if os.path.commonpath([path, repository]) == repository:
+            return repository
+    return None
+
+
+def _measure(
+    python: str, search_paths: list[str], modules: list[str], repeat: int
+) -> dict[str, float]:
+    """Imports modules in fresh interpreters.
+
+    Args:
+        python: The interpreter to import the modules with.
+        search_paths: The paths to import the modules from.
+        modules: The modules to import.
+        repeat: The number of interpreters to import the modules in.
+
+    Raises:
+        subprocess.CalledProcessError: When the modules cannot be imported.
+
+    Returns:
+        The median import time in seconds, number of filesystem accesses and number
+        of distinct paths accessed.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        search_paths + list(filter(None, [env.get("PYTHONPATH")]))
+    )
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    durations = []
+    accesses = []
+    paths = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [python, "-c", _IMPORT_SCRIPT, *modules],
+            check=True,
+            env=env,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        result = json.loads(process.stdout.strip().rpartition("\n")[2])
+        durations.append(result["duration"])
+        accesses.append(result["accesses"])
+        paths.append(result["paths"])
+
+    return {
+        "duration": statistics.median(durations),
+        "accesses": statistics.median(accesses),
+        "paths": statistics.median(paths),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument(
+        "sources", nargs="+", help="The directories the modules are installed in"
+    )
+    parser.add_argument(
+        "-m",
+        "--module",
+        action="append",
+        required=True,
+        dest="modules",
+        help="A module to import",
+    )
+    parser.add_argument(
+        "-n",
+        "--repeat",
+        type=int,
+        default=10,
+        help="The number of times to import the modules",
+    )
+    parser.add_argument(
+        "--python",
+        default=sys.executable,
+        help="The interpreter to import the modules with",
+    )
+    parser.add_argument(
+        "--tmpdir",
+        help=(
+            "The directory to copy the sources into. Defaults to the package"
+            " repository containing the first source"
+        ),
+    )
+    args = parser.parse_args()
+
+    results = benchmark(
+        args.sources, args.modules, args.repeat, args.python, args.tmpdir
+    )
+    print(f"Measured in {args.tmpdir or find_repository(args.sources[0])}")
+    print(f"{'Layout':<12} {'Import time':>12} {'Accesses':>9} {'Paths':>6}")
+    for layout, result in results.items():
+        print(
+            f"{layout:<12} {result['duration'] * 1000:>10.1f}ms"
+            f" {result['accesses']:>9.0f} {result['paths']:>6.0f}"
+        )
@@ -0,0 +1,76 @@
+"""Searches for version strings that are embedded in large binaries.
+
+Binaries are memory-mapped and searched in bounded windows, so they are never read
+into memory all at once and never need to be launched. Results are cached until the
+binary is modified.
+"""
+import mmap
+import os
+import re
+
+import recipe_cache
+
+
+# The amount of a binary searched at once
+WINDOW_SIZE = 16 * 1024 * 1024
+
+# The overlap between windows, which bounds the length of a match that is guaranteed
+# to be found even when it straddles two windows
+WINDOW_OVERLAP = 256
+
+
+def search(path: str | os.PathLike, pattern: re.Pattern[bytes] | bytes) -> str | None:
+    """Searches a binary for the first match of a version pattern.
+
+    Args:
+        path: The binary to search.
+        pattern: A pattern whose first group captures the version.
+
+    Returns:
+        The captured version, if found.
+    """
+    if isinstance(pattern, bytes):
+        pattern = re.compile(pattern)
+
+    path = os.fspath(path)
+    key = f"{pattern.pattern!r}:{recipe_cache.fingerprint(path)}"
+
+    cached = recipe_cache.load("binary_versions", key)
+    if cached is not None:
+        # Binaries without a match are cached as empty strings
+        return cached or None
+
+    try:
+        version = _search_uncached(path, pattern)
+    except (OSError, ValueError):
+        # The binary is missing, unreadable or empty
+        return None
+
+    recipe_cache.store("binary_versions", key, version or "")
+    return version
+
+
+def _search_uncached(path: str, pattern: re.Pattern[bytes]) -> str | None:
+    """Searches a binary for the first match of a version pattern without caching.
+
+    Args:
+        path: The binary to search.
+        pattern: A pattern whose first group captures the version.
+
+    Raises:
+        OSError: When the binary cannot be opened.
+        ValueError: When the binary is empty.
+
+    Returns:
+        The captured version, if found.
+    """
+    with open(path, "rb") as binary_file, mmap.mmap(
+        binary_file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as binary_map:
+        for start in range(0, len(binary_map), WINDOW_SIZE):
+            window_start = max(start - WINDOW_OVERLAP, 0)
+            match = pattern.search(binary_map[window_start : start + WINDOW_SIZE])
+            if match:
+                return match.group(1).decode("ascii", errors="replace")
+
+    return None
@@ -0,0 +1,37 @@
+"""On/off flags that change how recipes are evaluated, such as reading lockfiles.
+
+A flag is enabled by passing ``-D<NAME>=ON`` to rez-build, which rez-build passes on to
+CMake, or by setting the environment variable of the same name to a true value. The
+argument takes precedence over the environment.
+
+This module only depends on the standard library, as it is imported by every package
+definition that reads a flag.
+"""
+import os
+import re
+import sys
+
+
+# The values that enable a flag, compared case-insensitively like CMake's
+_TRUE_VALUES = {"1", "ON", "TRUE", "Y", "YES"}
+
+
+def enabled(name: str) -> bool:
+    """Determines whether a flag is enabled, from rez-build's arguments or the
+    environment.
+
+    Args:
+        name: The name of the CMake variable and environment variable.
+
+    Returns:
+        True if the flag is enabled.
+    """
+    value = os.environ.get(name, "")
+
+    variable_pattern = re.compile(rf"-D{re.escape(name)}(:\w+)?=(.*)")
+    for arg in sys.argv:
+        match = variable_pattern.search(arg)
+        if match:
+            value = match.group(2) or value
+
+    return value.strip().upper() in _TRUE_VALUES
@@ -0,0 +1,136 @@
+"""Checks that the modules imported by the recipes' package definitions stay cheap to
+import, as rez imports them every time it loads a package definition.
+
+Each module is imported with ``python -X importtime`` in fresh interpreters that have
+already imported ``rez.packages``, as rez has when it loads a package definition, so
+only the cost that the module adds to rez's own imports is measured. The check fails
+when a module's median cumulative import time exceeds the budget, or when importing it
+loads any more of rez's modules, which should only be imported inside the functions
+that need them::
+
+    python check_import_time.py [--budget MS] [MODULE ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+
+# The modules that package definitions import
+MODULES = (
+    "lockfiles",
+    "maya_packaging",
+    "pacman",
+    "python_packaging",
+    "qt_packaging",
+    "tool_discovery",
+    "unreal_packaging",
+    "zip_bundles",
+)
+
+# The default budget for each module's cumulative import time, in milliseconds
+DEFAULT_BUDGET = 25.0
+
+# Imports a module after the rez modules that load package definitions, and prints
+# the rez modules that were loaded along with it. importlib.import_module() isn't
+# reported by -X importtime, unlike __import__()
+_IMPORT_SCRIPT = """
+import sys
+
+import rez.packages
+
+loaded = set(sys.modules)
+__import__(sys.argv[1])
+print(" ".join(sorted(
+    name for name in set(sys.modules) - loaded if name.split(".")[0] == "rez"
+)))
+"""
+
+
+def measure(module: str, repeat: int = 5) -> tuple[float, list[str]]:
+    """Imports a module in fresh interpreters that have already imported
+    ``rez.packages``.
+
+    Args:
+        module: The module to import from this directory.
+        repeat: The number of interpreters to import the module in.
+
+    Raises:
+        subprocess.CalledProcessError: When rez or the module cannot be imported.
+
+    Returns:
+        The median cumulative import time in milliseconds and the rez modules loaded
+        by the import, besides those already loaded by ``rez.packages``.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [os.path.dirname(os.path.abspath(__file__))]
+        + list(filter(None, [env.get("PYTHONPATH")]))
+    )
+
+    durations = []
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _IMPORT_SCRIPT, module],
+            check=True,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+        durations.append(_cumulative_time(process.stderr, module))
+
+    return statistics.median(durations), process.stdout.split()
+
+
+def _cumulative_time(importtime_output: str, module: str) -> float:
+    """Reads a module's cumulative import time from ``-X importtime`` output.
+
+    Args:
+        importtime_output: The interpreter's error output.
+        module: The imported module.
+
+    Raises:
+        ValueError: When the module's import isn't listed.
+
+    Returns:
+        The time in milliseconds.
+    """
+    for line in importtime_output.splitlines():
+        fields = [field.strip() for field in line.partition(":")[2].split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+
+    raise ValueError(f"{module} was not imported")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument(
+        "modules", nargs="*", default=MODULES, help="The modules to import"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        help="The maximum cumulative import time of each module, in milliseconds",
+    )
+    parser.add_argument(
+        "-n", "--repeat", type=int, default=5, help="The number of times to import"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'Module':<20} {'Import time':>12}  Problems")
+    for module in args.modules:
+        duration, rez_modules = measure(module, args.repeat)
+        problems = []
+        if duration > args.budget:
+            problems.append(f"over the {args.budget:g}ms budget")
+        if rez_modules:
+            problems.append(f"imports {', '.join(rez_modules[:3])}")
+        failed = failed or bool(problems)
+        print(f"{module:<20} {duration:>10.1f}ms  {'; '.join(problems)}")
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,218 @@
+"""Deduplication of the files that are identical between the installed variants of a
+package family.
+
+Variants of packages such as mGear, SHAPES and ngSkinTools each install a full copy of
+the same scripts, icons and docs, while only their plug-ins differ between Maya years.
+This finds files with identical contents across the variants of a family by hashing
+them, and replaces the duplicates with hard links to a single copy. Besides the space
+reclaimed, a file server then only caches one copy of each file in memory, however many
+variants are in use.
+
+Only files with the same owner and permissions on the same filesystem are linked, and
+the markers that recipes rewrite in place, such as ``.rez-recipes-fingerprint``, are
+left alone. CMake replaces installed files rather than writing into them, so rebuilding
+a variant doesn't modify the files it shares with other variants. Run after the
+variants have been installed::
+
+    python dedup.py [--path REPOSITORY] [--dry-run] FAMILY [FAMILY ...]
+"""
+from collections.abc import Iterable
+import argparse
+import dataclasses
+import os
+import pathlib
+import stat
+
+import archives
+
+
+# Files that recipes write into installed variants in place, which must not be shared
+_EXCLUDED_PREFIX = ".rez-recipes"
+
+# The suffix of the temporary links that replace duplicates
+_TEMP_SUFFIX = ".dedup.tmp"
+
+
+@dataclasses.dataclass(frozen=True)
+class DedupResult:
+    """The duplicates that were replaced with links."""
+
+    files: int = 0
+    reclaimed: int = 0
+
+
+def variant_roots(
+    family: str, paths: Iterable[str] | None = None
+) -> list[pathlib.Path]:
+    """Lists the installed variants of a package family.
+
+    Args:
+        family: The name of the package family.
+        paths: The package repositories to search. Defaults to rez's packages path.
+
+    Returns:
+        The root directory of each variant.
+    """
+    from rez.packages import iter_packages
+
+    roots = []
+    for package in iter_packages(family, paths=list(paths) if paths else None):
+        for variant in package.iter_variants():
+            root = pathlib.Path(variant.root)
+            if root.is_dir():
+                roots.append(root)
+    return roots
+
+
+def dedup(roots: Iterable[str | os.PathLike], dry_run: bool = False) -> DedupResult:
+    """Replaces the files that are identical between directories with hard links to a
+    single copy.
+
+    Args:
+        roots: The directories to search, such as the roots of a family's variants.
+        dry_run: Only reports the duplicates without linking them.
+
+    Returns:
+        The number of files replaced with links and the number of bytes reclaimed.
+    """
+    # Hashing is only needed when more than one file has the same size
+    candidates: dict[tuple, dict[tuple[int, int], list[pathlib.Path]]] = {}
+    stats: dict[tuple[int, int], os.stat_result] = {}
+    for path, status in _iter_files(roots):
+        inode = (status.st_dev, status.st_ino)
+        key = (
+            status.st_dev,
+            status.st_size,
+            status.st_mode,
+            status.st_uid,
+            status.st_gid,
+        )
+        candidates.setdefault(key, {}).setdefault(inode, []).append(path)
+        stats[inode] = status
+
+    files = 0
+    reclaimed = 0
+    for inodes in candidates.values():
+        if len(inodes) < 2:
+            continue
+
+        by_digest: dict[str, list[tuple[int, int]]] = {}
+        for inode, paths in inodes.items():
+            try:
+                digest = archives.digest(paths[0])
+            except OSError:
+                continue
+            by_digest.setdefault(digest, []).append(inode)
+
+        for duplicates in by_digest.values():
+            if len(duplicates) < 2:
+                continue
+
+            # Keep the copy that is already shared the most, then the first by path
+            duplicates.sort(key=lambda inode: (-stats[inode].st_nlink, inodes[inode]))
+            keeper = inodes[duplicates[0]][0]
+            for inode in duplicates[1:]:
+                linked = 0
+                for path in inodes[inode]:
+                    if dry_run or _link(keeper, path, stats[inode]):
+                        linked += 1
+                files += linked
+                # The data is only freed once no other links to it remain
+                if linked == stats[inode].st_nlink:
+                    reclaimed += stats[inode].st_size
+
+    return DedupResult(files, reclaimed)
+
+
+def _iter_files(
+    roots: Iterable[str | os.PathLike],
+) -> Iterable[tuple[pathlib.Path, os.stat_result]]:
+    """Lists the regular files that can be shared in directories, without following
+    symbolic links. Files in more than one of the directories are listed once.
+
+    Args:
+        roots: The directories to search.
+
+    Yields:
+        Each file and its status.
+    """
+    seen = set()
+    for root in roots:
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if filename.startswith(_EXCLUDED_PREFIX) or filename.endswith(
+                    _TEMP_SUFFIX
+                ):
+                    continue
+                path = pathlib.Path(dirpath, filename)
+                if path in seen:
+                    continue
+                seen.add(path)
+                try:
+                    status = path.lstat()
+                except OSError:
+                    continue
+                # Empty files share no data
+                if not stat.S_ISREG(status.st_mode) or not status.st_size:
+                    continue
+                yield path, status
+
+
+def _link(keeper: pathlib.Path, path: pathlib.Path, status: os.stat_result) -> bool:
+    """Atomically replaces a file with a hard link to an identical file.
+
+    Args:
+        keeper: The copy to link to.
+        path: The duplicate to replace.
+        status: The duplicate's status when it was hashed.
+
+    Returns:
+        True if the duplicate was replaced, or False if it has changed since it was
+        hashed or cannot be linked, e.g. when the filesystem doesn't support hard
+        links.
+    """
+    temp_path = path.with_name(path.name + _TEMP_SUFFIX)
+    try:
+        current = path.lstat()
+        if (current.st_ino, current.st_size, current.st_mtime_ns) != (
+            status.st_ino,
+            status.st_size,
+            status.st_mtime_ns,
+        ):
+            return False
+        os.link(keeper, temp_path)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument("families", nargs="+", help="The package families to dedup")
+    parser.add_argument(
+        "--path",
+        action="append",
+        dest="paths",
+        help="A package repository to dedup. Defaults to rez's packages path",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Report the duplicates without linking them",
+    )
+    args = parser.parse_args()
+
+    for family in args.families:
+        roots = variant_roots(family, args.paths)
+        result = dedup(roots, args.dry_run)
+        verb = "Would link" if args.dry_run else "Linked"
+        print(
+            f"{family}: {verb} {result.files} duplicate files across {len(roots)}"
+            f" variants, reclaiming {result.reclaimed / 1024 / 1024:.1f} MB"
+        )
@@ -0,0 +1,564 @@
+"""Downloads of vendor archives, verified against a SHA-256 digest.
+
+Archives are hashed while they are streamed to disk, so verifying them doesn't need a
+second pass over the file. When the server accepts range requests, large archives are
+split into ranges that are fetched over several connections at once, which is faster
+over high-latency links where a single connection cannot fill the bandwidth. Progress
+is saved next to the partial download, so an interrupted download resumes from where
+it stopped instead of starting over.
+
+Archives are stored in the ``downloads`` directory of the recipe cache, so the variants
+of a package share a single download. The digest published by the vendor must be given
+for URLs, e.g. with ``-DFETCH_SHA256``, as trusting whatever was downloaded first would
+only detect changes to an archive rather than a tampered one. Local paths, such as a
+SHAPES zip, are verified in place when a digest is given.
+
+This module only depends on the standard library so that it can be run during a build
+with the host's Python 3.10 or later, see Download.cmake. It prints the archive's path
+and digest::
+
+    python downloads.py URL [--sha256 DIGEST] [--connections N]
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import http.client
+import json
+import os
+import pathlib
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import archives
+import locks
+import recipe_cache
+
+
+# The default number of connections used for each download
+CONNECTIONS = 4
+
+# The number of attempts made for each range
+MAX_ATTEMPTS = 4
+
+# Seconds to wait for a connection or for data
+TIMEOUT = 30.0
+
+# Seconds to wait before the first retry, which doubles with each attempt
+_BACKOFF = 0.5
+
+_CHUNK_SIZE = 1024 * 1024
+
+# Archives are only split into ranges of at least this many bytes
+_MIN_RANGE_SIZE = 8 * 1024 * 1024
+
+# Seconds between saves of a download's progress
+_SAVE_INTERVAL = 0.5
+
+_USER_AGENT = "rez-recipes"
+
+
+class DownloadError(OSError):
+    """Raised when an archive cannot be downloaded or doesn't match its digest."""
+
+
+def download(
+    url: str, sha256: str | None = None, connections: int = CONNECTIONS
+) -> tuple[pathlib.Path, str]:
+    """Downloads an archive into the recipe cache unless it has already been
+    downloaded, and verifies its digest.
+
+    Args:
+        url: The URL of the archive, or a local path to verify.
+        sha256: The expected hexadecimal digest, which is only optional for local
+            paths.
+        connections: The maximum number of connections to download over.
+
+    Raises:
+        DownloadError: When no digest is given for a URL, or the archive cannot be
+            downloaded or doesn't match the expected digest.
+
+    Returns:
+        The path of the archive and its digest.
+    """
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        path = pathlib.Path(
+            urllib.request.url2pathname(parts.path) if parts.scheme == "file" else url
+        )
+        try:
+            digest = archives.digest(path)
+        except OSError as error:
+            raise DownloadError(f"Could not read {path}: {error}") from None
+        _verify(url, digest, sha256)
+        return path, digest
+
+    if not sha256:
+        raise DownloadError(
+            f"No SHA-256 digest was given for {url}, pass the digest published for it"
+            " with -DFETCH_SHA256=<digest>"
+        )
+
+    name = os.path.basename(parts.path) or "download"
+    url_digest = hashlib.sha256(url.encode()).hexdigest()[:16]
+    destination = recipe_cache.cache_dir().joinpath("downloads", url_digest, name)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    # Builds of each variant wait for the first to download the archive
+    with locks.locked(destination):
+        return destination, _download_locked(url, destination, sha256, connections)
+
+
+def _download_locked(
+    url: str, destination: pathlib.Path, sha256: str, connections: int
+) -> str:
+    """Downloads an archive while holding the destination's lock.
+
+    Args:
+        url: The URL of the archive.
+        destination: The path to download to.
+        sha256: The expected digest.
+        connections: The maximum number of connections to download over.
+
+    Raises:
+        DownloadError: When the archive cannot be downloaded or doesn't match the
+            expected digest.
+
+    Returns:
+        The archive's digest.
+    """
+    if destination.is_file():
+        # The archive is only rehashed when it changed since its digest was recorded
+        recorded = recipe_cache.load("downloads", url) or {}
+        if recorded.get("fingerprint") == recipe_cache.fingerprint(destination):
+            digest = recorded["sha256"]
+        else:
+            digest = archives.digest(destination)
+        if digest == sha256.strip().lower():
+            _record(url, destination, digest)
+            return digest
+
+    partial = destination.with_name(destination.name + ".partial")
+    digest = _fetch(url, partial, connections)
+    try:
+        _verify(url, digest, sha256)
+    except DownloadError:
+        _remove(partial, _state_path(partial))
+        raise
+
+    os.replace(partial, destination)
+    _remove(_state_path(partial))
+    _record(url, destination, digest)
+    return digest
+
+
+def _fetch(url: str, partial: pathlib.Path, connections: int) -> str:
+    """Downloads a URL into a partial file, resuming a previous download of the same
+    file.
+
+    Args:
+        url: The URL to download.
+        partial: The partial file to write.
+        connections: The maximum number of connections to download over.
+
+    Raises:
+        DownloadError: When the URL cannot be downloaded.
+
+    Returns:
+        The downloaded file's digest.
+    """
+    size, validator = _probe(url)
+    if size is None or validator is None:
+        # Without ranges or a way of telling whether the file changed, the download
+        # cannot be split or resumed
+        _remove(partial, _state_path(partial))
+        return _fetch_whole(url, partial)
+
+    state_path = _state_path(partial)
+    state = _read_state(state_path)
+    if (
+        state.get("url") != url
+        or state.get("size") != size
+        or state.get("validator") != validator
+        or not partial.is_file()
+    ):
+        count = max(1, min(connections, size // _MIN_RANGE_SIZE))
+        bounds = [size * index // count for index in range(count + 1)]
+        state = {
+            "url": url,
+            "size": size,
+            "validator": validator,
+            # The start, end and downloaded position of each range
+            "ranges": [[bounds[i], bounds[i + 1], bounds[i]] for i in range(count)],
+        }
+        with open(partial, "wb") as partial_file:
+            partial_file.truncate(size)
+
+    return _RangedDownload(url, partial, state_path, state).run()
+
+
+def _fetch_whole(url: str, partial: pathlib.Path) -> str:
+    """Downloads a URL over a single connection, starting over on each attempt.
+
+    Args:
+        url: The URL to download.
+        partial: The file to write.
+
+    Raises:
+        DownloadError: When every attempt fails.
+
+    Returns:
+        The downloaded file's digest.
+    """
+    error: Exception | None = None
+    for attempt in range(MAX_ATTEMPTS):
+        if attempt:
+            time.sleep(_BACKOFF * 2 ** (attempt - 1))
+        sha256 = hashlib.sha256()
+        try:
+            with _open(url) as response, open(partial, "wb") as partial_file:
+                for chunk in iter(lambda: response.read(_CHUNK_SIZE), b""):
+                    sha256.update(chunk)
+                    partial_file.write(chunk)
+            return sha256.hexdigest()
+        except urllib.error.HTTPError as http_error:
+            if http_error.code < 500 and http_error.code != 429:
+                raise DownloadError(f"Could not download {url}: {http_error}") from None
+            error = http_error
+        except (OSError, http.client.HTTPException) as connection_error:
+            error = connection_error
+
+    raise DownloadError(f"Could not download {url}: {error}")
+
+
+class _RangedDownload:
+    """Downloads the ranges of a file over concurrent connections, while hashing the
+    downloaded prefix of the file as it grows.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        partial: pathlib.Path,
+        state_path: pathlib.Path,
+        state: dict,
+    ):
+        self._url = url
+        self._partial = partial
+        self._state_path = state_path
+        self._state = state
+        self._ranges = state["ranges"]
+        self._lock = threading.Lock()
+        self._last_save = 0.0
+        self._cancelled = threading.Event()
+
+        self._hash_lock = threading.Lock()
+        self._sha256 = hashlib.sha256()
+        self._hashed = 0
+
+    def run(self) -> str:
+        """Downloads every range that hasn't been downloaded yet.
+
+        Raises:
+            DownloadError: When a range cannot be downloaded.
+
+        Returns:
+            The file's digest.
+        """
+        pending = [range_ for range_ in self._ranges if range_[2] < range_[1]]
+        try:
+            if pending:
+                with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=len(pending), thread_name_prefix="downloads"
+                ) as executor:
+                    futures = [
+                        executor.submit(self._fetch_range, range_) for range_ in pending
+                    ]
+                    for future in concurrent.futures.as_completed(futures):
+                        if future.exception():
+                            self._cancelled.set()
+                    for future in futures:
+                        future.result()
+        finally:
+            self._cancelled.set()
+            with self._lock:
+                self._save()
+
+        self._hash_available(block=True)
+        return self._sha256.hexdigest()
+
+    def _fetch_range(self, range_: list[int]) -> None:
+        """Downloads the rest of a range, retrying transient failures.
+
+        Args:
+            range_: The start, end and downloaded position of the range.
+
+        Raises:
+            DownloadError: When every attempt fails, or the file changed on the server.
+        """
+        error: Exception | None = None
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                time.sleep(_BACKOFF * 2 ** (attempt - 1))
+            if self._cancelled.is_set():
+                return
+            try:
+                self._request_range(range_)
+                return
+            except DownloadError:
+                # The file changed on the server, which retrying won't fix
+                raise
+            except urllib.error.HTTPError as http_error:
+                if http_error.code < 500 and http_error.code != 429:
+                    raise DownloadError(
+                        f"Could not download {self._url}: {http_error}"
+                    ) from None
+                error = http_error
+            except (OSError, http.client.HTTPException) as connection_error:
+                error = connection_error
+
+        raise DownloadError(f"Could not download {self._url}: {error}")
+
+    def _request_range(self, range_: list[int]) -> None:
+        """Requests the rest of a range and writes it into the partial file.
+
+        Args:
+            range_: The start, end and downloaded position of the range.
+
+        Raises:
+            DownloadError: When the file changed on the server.
+        """
+        headers = {
+            "Range": f"bytes={range_[2]}-{range_[1] - 1}",
+            # The whole file is sent instead if it no longer matches the validator
+            "If-Range": self._state["validator"],
+        }
+        with _open(self._url, headers) as response, open(
+            self._partial, "r+b"
+        ) as partial_file:
+            if response.status != 206:
+                # Start over on the next build
+                with self._lock:
+                    self._ranges[:] = []
+                raise DownloadError(f"{self._url} changed while it was downloaded")
+
+            partial_file.seek(range_[2])
+            while range_[2] < range_[1] and not self._cancelled.is_set():
+                chunk = response.read(min(_CHUNK_SIZE, range_[1] - range_[2]))
+                if not chunk:
+                    raise http.client.IncompleteRead(b"", range_[1] - range_[2])
+                partial_file.write(chunk)
+                partial_file.flush()
+                with self._lock:
+                    range_[2] += len(chunk)
+                    if time.monotonic() - self._last_save > _SAVE_INTERVAL:
+                        self._save()
+                self._hash_available()
+
+    def _hash_available(self, block: bool = False) -> None:
+        """Hashes the part of the file that has been downloaded contiguously from the
+        start. Only one thread hashes at a time, so the others carry on downloading.
+
+        Args:
+            block: Waits for another thread that is hashing, to hash everything that
+                has been downloaded.
+        """
+        if not self._hash_lock.acquire(blocking=block):
+            return
+        try:
+            with open(self._partial, "rb") as partial_file:
+                while True:
+                    with self._lock:
+                        available = self._available()
+                    if available <= self._hashed:
+                        return
+                    partial_file.seek(self._hashed)
+                    while self._hashed < available:
+                        chunk = partial_file.read(
+                            min(_CHUNK_SIZE, available - self._hashed)
+                        )
+                        if not chunk:
+                            return
+                        self._sha256.update(chunk)
+                        self._hashed += len(chunk)
+        finally:
+            self._hash_lock.release()
+
+    def _available(self) -> int:
+        """Determines how much of the file has been downloaded contiguously from the
+        start. The lock must be held.
+
+        Returns:
+            The number of bytes.
+        """
+        available = 0
+        for start, end, position in self._ranges:
+            if start > available:
+                break
+            available = position
+            if position < end:
+                break
+        return available
+
+    def _save(self) -> None:
+        """Saves the download's progress, so that it can be resumed. The lock must be
+        held.
+        """
+        self._last_save = time.monotonic()
+        if not self._ranges:
+            _remove(self._partial, self._state_path)
+            return
+
+        temp_path = self._state_path.with_name(self._state_path.name + ".tmp")
+        try:
+            with open(temp_path, "w") as state_file:
+                json.dump(self._state, state_file)
+            os.replace(temp_path, self._state_path)
+        except OSError:
+            pass
+
+
+def _open(url: str, headers: dict[str, str] | None = None) -> http.client.HTTPResponse:
+    """Sends a GET request, following redirects.
+
+    Args:
+        url: The URL to request.
+        headers: Extra request headers.
+
+    Raises:
+        urllib.error.HTTPError: When the response is an error.
+
+    Returns:
+        The response.
+    """
+    request = urllib.request.Request(
+        url,
+        headers={"User-Agent": _USER_AGENT, **(headers or {})},
+    )
+    return urllib.request.urlopen(request, timeout=TIMEOUT)
+
+
+def _probe(url: str) -> tuple[int | None, str | None]:
+    """Determines whether a download can be split into ranges and resumed, by
+    requesting its first byte. Unlike a HEAD request, the range is kept when
+    redirects are followed.
+
+    Args:
+        url: The URL to download.
+
+    Returns:
+        The size of the file and a validator identifying its version, or None for
+        both if the server doesn't accept range requests.
+    """
+    try:
+        with _open(url, {"Range": "bytes=0-0"}) as response:
+            status = response.status
+            content_range = response.headers.get("Content-Range", "")
+            etag = response.headers.get("ETag", "")
+            last_modified = response.headers.get("Last-Modified")
+    except (OSError, http.client.HTTPException):
+        return None, None
+
+    # Weak ETags cannot be used with If-Range
+    validator = etag if etag and not etag.startswith("W/") else last_modified
+    match = re.fullmatch(r"bytes 0-0/(\d+)", content_range.strip())
+    if status != 206 or not match or not validator:
+        return None, None
+    return int(match.group(1)), validator
+
+
+def _read_state(state_path: pathlib.Path) -> dict:
+    """Reads the saved progress of a download.
+
+    Args:
+        state_path: The file the progress was saved to.
+
+    Returns:
+        The progress, which is empty if none was saved.
+    """
+    try:
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def _record(url: str, destination: pathlib.Path, digest: str) -> None:
+    """Records a downloaded archive's digest, so that it isn't hashed again by later
+    builds while the archive is unchanged.
+
+    Args:
+        url: The URL of the archive.
+        destination: The downloaded archive.
+        digest: The archive's digest.
+    """
+    recipe_cache.store(
+        "downloads",
+        url,
+        {"sha256": digest, "fingerprint": recipe_cache.fingerprint(destination)},
+    )
+
+
+def _remove(*paths: pathlib.Path) -> None:
+    """Removes files, ignoring those that are missing.
+
+    Args:
+        paths: The files to remove.
+    """
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _state_path(partial: pathlib.Path) -> pathlib.Path:
+    """Determines the file that a partial download's progress is saved to.
+
+    Args:
+        partial: The partial download.
+
+    Returns:
+        The path.
+    """
+    return partial.with_name(partial.name + ".json")
+
+
+def _verify(url: str, digest: str, expected: str | None) -> None:
+    """Checks a digest against the expected digest.
+
+    Args:
+        url: The URL or path of the archive, for error messages.
+        digest: The archive's digest.
+        expected: The expected digest, if known.
+
+    Raises:
+        DownloadError: When the digests differ.
+    """
+    if expected and digest != expected.strip().lower():
+        raise DownloadError(
+            f"The SHA-256 digest of {url} is {digest}, but {expected} was expected"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("url", help="The URL of the archive, or a local path")
+    parser.add_argument(
+        "--sha256", help="The expected SHA-256 digest, which is required for URLs"
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=CONNECTIONS,
+        help="The maximum number of connections to download over",
+    )
+    args = parser.parse_args()
+
+    path, digest = download(args.url, args.sha256 or None, args.connections)
+    print(path)
+    print(digest)
@@ -0,0 +1,171 @@
+"""Lockfiles recording the values that recipes probe for while they are evaluated.
+
+Recipes look up the results of slow or machine-dependent probes, such as running
+mayapy, querying pacman or fetching release listings, through :func:`get`.
+``resolve.py`` records every value looked up this way into a ``package.lock.json``
+next to each recipe's package.py.
+
+Lockfiles are only read when the ``REZ_RECIPES_LOCKFILE`` environment variable is set
+to a true value, or when ``-DREZ_RECIPES_LOCKFILE=ON`` is passed to rez-build. Values
+are then returned from the lockfile instead of being probed, which makes evaluation
+fast and reproducible on machines without the probed software or network access.
+Values missing from the lockfile are still probed.
+"""
+from collections.abc import Callable, Iterator
+import contextlib
+import contextvars
+import inspect
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import typing
+
+import build_flags
+
+
+# The environment variable that enables reading lockfiles
+ENV_VAR = "REZ_RECIPES_LOCKFILE"
+
+# The name of the lockfile written to each recipe's directory
+LOCKFILE_NAME = "package.lock.json"
+
+# The version of the lockfile's layout
+LOCKFILE_VERSION = 1
+
+_T = typing.TypeVar("_T")
+
+# The values probed by the recipe being evaluated, while a lockfile is being written
+_recording: contextvars.ContextVar[
+    dict[str, typing.Any] | None
+] = contextvars.ContextVar("_recording", default=None)
+
+_lockfiles: dict[pathlib.Path, dict[str, typing.Any]] = {}
+_lockfiles_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    """Determines whether lockfiles should be read, from rez-build's arguments or the
+    environment.
+
+    Returns:
+        True if lockfiles should be read.
+    """
+    return build_flags.enabled(ENV_VAR)
+
+
+def get(key: str, probe: Callable[[], _T], selector: str | None = None) -> _T:
+    """Looks up a value in the calling recipe's lockfile, or probes for it when
+    lockfiles aren't enabled or the value is missing. This must be called directly
+    from a recipe's package.py, which the lockfile is found next to.
+
+    Args:
+        key: The name of the value, such as the variable or attribute it is assigned
+            to.
+        probe: Determines the value when it isn't locked.
+        selector: The value of a CMake variable that selects what the recipe
+            packages, such as ``-DMAYA_YEAR``. Lockfiles record what is packaged
+            without one, so the value is always probed when one is given.
+
+    Returns:
+        The value. Tuples are returned as lists when read from a lockfile.
+    """
+    caller = inspect.currentframe().f_back
+    recipe_path = pathlib.Path(os.path.abspath(caller.f_code.co_filename)).parent
+    del caller
+
+    recorded = _recording.get()
+    if recorded is None and not selector and enabled():
+        lock = read(recipe_path)
+        for section in ("probes", "attributes"):
+            if key in lock.get(section, {}):
+                return lock[section][key]
+
+    value = probe()
+    if recorded is not None:
+        recorded[key] = value
+    return value
+
+
+def read(recipe_path: str | os.PathLike) -> dict[str, typing.Any]:
+    """Reads a recipe's lockfile once per process.
+
+    Args:
+        recipe_path: The directory containing the recipe's package.py.
+
+    Returns:
+        The contents of the lockfile, which are empty if there is no usable lockfile.
+    """
+    path = pathlib.Path(recipe_path, LOCKFILE_NAME)
+
+    with _lockfiles_lock:
+        if path not in _lockfiles:
+            try:
+                with open(path) as lock_file:
+                    lock = json.load(lock_file)
+            except (OSError, ValueError):
+                lock = {}
+            if not isinstance(lock, dict) or (
+                lock.get("lockfile_version") != LOCKFILE_VERSION
+            ):
+                lock = {}
+            _lockfiles[path] = lock
+        return _lockfiles[path]
+
+
+@contextlib.contextmanager
+def recording() -> Iterator[dict[str, typing.Any]]:
+    """Records the values that a recipe probes for while it is evaluated in this
+    thread. Lockfiles aren't read while recording.
+
+    Yields:
+        The recorded values, keyed by name.
+    """
+    probes: dict[str, typing.Any] = {}
+    token = _recording.set(probes)
+    try:
+        yield probes
+    finally:
+        _recording.reset(token)
+
+
+def write(
+    recipe_path: str | os.PathLike,
+    name: str,
+    attributes: dict[str, typing.Any],
+    probes: dict[str, typing.Any],
+) -> pathlib.Path:
+    """Atomically replaces a recipe's lockfile, so a recipe never reads a partial
+    lockfile.
+
+    Args:
+        recipe_path: The directory containing the recipe's package.py.
+        name: The package's name.
+        attributes: The package's evaluated attributes.
+        probes: The values that the recipe probed for.
+
+    Returns:
+        The lockfile.
+    """
+    path = pathlib.Path(recipe_path, LOCKFILE_NAME)
+    lock = {
+        "lockfile_version": LOCKFILE_VERSION,
+        "name": name,
+        "attributes": attributes,
+        "probes": probes,
+    }
+
+    fd, temp_path = tempfile.mkstemp(prefix=path.name, suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w") as lock_file:
+            json.dump(lock, lock_file, indent=4, sort_keys=True)
+            lock_file.write("\n")
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    with _lockfiles_lock:
+        _lockfiles.pop(path, None)
+    return path
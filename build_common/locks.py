@@ -0,0 +1,494 @@
+"""Locks that keep concurrent builds from corrupting shared caches and installs.
+
+A lock is made of two parts, both kept in the ``locks`` directory of the recipe cache
+under a hash of the locked path, so that nothing is written next to the path itself,
+e.g. into an installed package:
+
+* An ``fcntl`` record lock on ``<hash>.lock``, which efficiently serializes processes
+  on the same machine and is released automatically if its holder dies.
+* A lease file at ``<hash>.lease``, created atomically with ``O_EXCL``, which also
+  works between machines sharing the recipe cache on an NFS mount where ``fcntl``
+  locks may not be honoured. The holder refreshes the lease while it runs, so a lease
+  that hasn't been refreshed, by the clock of the server holding it, or whose holder
+  is no longer running on this machine, is considered stale and is broken.
+
+The slots of a semaphore instead limit a program across every user of a host, so they
+are ``fcntl`` locks on files in a directory of the system's temporary directory, named
+after the host, which is shared by every user.
+
+This module only depends on the standard library so that it can be used by scripts
+run during a build.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+import contextlib
+import errno
+import glob
+import hashlib
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import typing
+
+try:
+    import fcntl
+except ModuleNotFoundError:
+    # Windows only relies on the lease file
+    fcntl = None
+
+
+# Seconds after which a lease that hasn't been refreshed is considered stale
+LEASE_TIMEOUT = 120.0
+
+# Seconds between attempts to take a lease held by another process
+_POLL_INTERVAL = 0.1
+
+# The directory of the locks shared by every user of this host, such as mayapy's slots
+_HOST_LOCK_DIR = os.path.join(
+    tempfile.gettempdir(), f"rez-recipes-locks-{socket.gethostname()}"
+)
+
+# fcntl locks belong to the whole process, so the threads of a process are serialized
+# by these first, keyed by lock file or by semaphore name and number of slots
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_semaphores: dict[tuple[str, int], threading.BoundedSemaphore] = {}
+_thread_locks_lock = threading.Lock()
+
+
+class LockTimeoutError(TimeoutError):
+    """Raised when a lock cannot be acquired in time."""
+
+
+@contextlib.contextmanager
+def locked(path: str | os.PathLike, timeout: float | None = None) -> Iterator[None]:
+    """Holds an exclusive lock on a path for the duration of the context.
+
+    Args:
+        path: The path to lock, which doesn't need to exist.
+        timeout: The maximum number of seconds to wait, or None to wait forever.
+
+    Raises:
+        LockTimeoutError: When the lock cannot be acquired in time.
+    """
+    lock_base = _lock_base(path)
+    os.makedirs(os.path.dirname(lock_base), exist_ok=True)
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with _thread_lock(lock_base, deadline), _local_lock(lock_base + ".lock", deadline):
+        lease_path = lock_base + ".lease"
+        _acquire_lease(lease_path, deadline)
+        stop_refreshing = threading.Event()
+        refresher = threading.Thread(
+            target=_refresh_lease, args=(lease_path, stop_refreshing), daemon=True
+        )
+        refresher.start()
+        try:
+            yield
+        finally:
+            stop_refreshing.set()
+            refresher.join()
+            _release_lease(lease_path)
+
+
+@contextlib.contextmanager
+def semaphore(name: str, slots: int, timeout: float | None = None) -> Iterator[int]:
+    """Holds one of a number of slots for the duration of the context, so that at most
+    that many holders run at once on this host, whichever user or recipe cache they
+    build with.
+
+    Each slot is an ``fcntl`` lock on a file in a directory shared by every user of
+    this host, under the system's temporary directory. Where ``fcntl`` isn't available,
+    each slot is a lock on ``<name>.<slot>`` in the recipe cache instead.
+
+    Args:
+        name: The name of the slots, such as the program they limit.
+        slots: The number of slots.
+        timeout: The maximum number of seconds to wait, or None to wait forever.
+
+    Raises:
+        LockTimeoutError: When no slot becomes free in time.
+
+    Yields:
+        The index of the held slot.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    with _thread_locks_lock:
+        thread_semaphore = _thread_semaphores.setdefault(
+            (name, slots), threading.BoundedSemaphore(slots)
+        )
+    # Threads of this process wait here for their own slots, rather than polling
+    # the slots' locks
+    if not _acquire_before(thread_semaphore, deadline):
+        raise LockTimeoutError(f"Timed out waiting for a slot: {name}")
+
+    with contextlib.ExitStack() as stack:
+        stack.callback(thread_semaphore.release)
+        slot_base = None
+        if fcntl is not None:
+            _make_host_lock_dir()
+            slot_base = os.path.join(_HOST_LOCK_DIR, name)
+
+        while True:
+            for slot in range(slots):
+                try:
+                    if slot_base is None:
+                        slot_lock = locked(f"{name}.{slot}", timeout=0)
+                    else:
+                        slot_lock = _host_lock(f"{slot_base}.{slot}.lock")
+                    stack.enter_context(slot_lock)
+                except LockTimeoutError:
+                    continue
+                yield slot
+                return
+
+            if deadline is not None and time.monotonic() > deadline:
+                raise LockTimeoutError(f"Timed out waiting for a slot: {name}")
+            time.sleep(_POLL_INTERVAL)
+
+
+def _acquire_before(
+    lock: threading.Lock | threading.BoundedSemaphore, deadline: float | None
+) -> bool:
+    """Acquires a thread lock or semaphore, giving up at a deadline.
+
+    Args:
+        lock: The lock or semaphore.
+        deadline: The monotonic time to give up at, or None to wait forever.
+
+    Returns:
+        True if it was acquired.
+    """
+    if deadline is None:
+        return lock.acquire()
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return lock.acquire(blocking=False)
+    return lock.acquire(timeout=remaining)
+
+
+def _acquire_lease(lease_path: str, deadline: float | None) -> None:
+    """Creates the lease file, breaking it first if it is stale.
+
+    Args:
+        lease_path: The lease file.
+        deadline: The monotonic time to give up at, or None to wait forever.
+
+    Raises:
+        LockTimeoutError: When the lease cannot be acquired in time.
+    """
+    holder = json.dumps(
+        {"host": socket.gethostname(), "pid": os.getpid(), "time": time.time()}
+    )
+
+    while True:
+        try:
+            fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            pass
+        else:
+            with os.fdopen(fd, "w") as lease_file:
+                lease_file.write(holder)
+            return
+
+        stale_lease = _read_stale_lease(lease_path)
+        if stale_lease is not None:
+            _break_lease(lease_path, stale_lease)
+            continue
+
+        if deadline is not None and time.monotonic() > deadline:
+            raise LockTimeoutError(f"Timed out waiting for lease: {lease_path}")
+        time.sleep(_POLL_INTERVAL)
+
+
+def _break_lease(lease_path: str, stale_lease: str) -> None:
+    """Removes a stale lease in a single atomic rename. The lease is never restored,
+    so the breaker then competes for a new lease like every other process.
+
+    Args:
+        lease_path: The lease file.
+        stale_lease: Identifies the lease that was found to be stale.
+    """
+    unique_suffix = f"{socket.gethostname()}.{os.getpid()}.{threading.get_ident()}"
+
+    # Only one process may break each stale lease, otherwise a process that found
+    # the same lease stale could later break the new lease taken in its place
+    marker_path = (
+        f"{lease_path}.{hashlib.sha256(stale_lease.encode()).hexdigest()[:16]}.broken"
+    )
+    try:
+        os.close(os.open(marker_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except FileExistsError:
+        _remove_if_expired(marker_path, f"{marker_path}.{unique_suffix}")
+        return
+
+    broken_path = f"{lease_path}.{unique_suffix}.stale"
+    try:
+        os.rename(lease_path, broken_path)
+    except FileNotFoundError:
+        return
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(broken_path)
+
+    # Markers only need to outlive the processes that could share the same stale view
+    for old_marker_path in glob.glob(glob.escape(lease_path) + ".*.broken"):
+        _remove_if_expired(old_marker_path, f"{old_marker_path}.{unique_suffix}")
+
+
+@contextlib.contextmanager
+def _host_lock(lock_path: str) -> Iterator[None]:
+    """Holds a lock shared by every process on this host without waiting for it.
+
+    Args:
+        lock_path: The lock file in the host's lock directory.
+
+    Raises:
+        LockTimeoutError: When the lock is held.
+    """
+    deadline = time.monotonic()
+    with _thread_lock(lock_path, deadline), _local_lock(lock_path, deadline):
+        yield
+
+
+def _is_running(pid: int) -> bool:
+    """Determines whether a process is running on this machine.
+
+    Args:
+        pid: The process ID.
+
+    Returns:
+        True if the process exists.
+    """
+    if os.name == "nt":
+        # os.kill would terminate the process on Windows, so rely on the timeout
+        return True
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextlib.contextmanager
+def _local_lock(lock_path: str, deadline: float | None) -> Iterator[None]:
+    """Holds an ``fcntl`` lock, which is released automatically if the process dies.
+
+    Args:
+        lock_path: The lock file.
+        deadline: The monotonic time to give up at, or None to wait forever.
+
+    Raises:
+        LockTimeoutError: When the lock cannot be acquired in time.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with _open_lock_file(lock_path) as lock_file:
+        while True:
+            try:
+                fcntl.lockf(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except OSError as error:
+                if error.errno not in (errno.EAGAIN, errno.EACCES):
+                    raise
+            if deadline is not None and time.monotonic() > deadline:
+                raise LockTimeoutError(f"Timed out waiting for lock: {lock_path}")
+            time.sleep(_POLL_INTERVAL)
+
+        try:
+            yield
+        finally:
+            fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+
+def _lock_base(path: str | os.PathLike) -> str:
+    """Determines where the lock and lease files of a path are kept.
+
+    Args:
+        path: The locked path.
+
+    Returns:
+        The path of the files without their suffixes.
+    """
+    # Imported here as recipe_cache locks its own files with this module
+    import recipe_cache
+
+    key = hashlib.sha256(os.path.realpath(path).encode()).hexdigest()
+    return os.path.join(recipe_cache.cache_dir(), "locks", key)
+
+
+def _make_host_lock_dir() -> None:
+    """Creates the directory of the locks shared by every user of this host, which
+    anyone may add files to, but only remove their own.
+    """
+    try:
+        os.mkdir(_HOST_LOCK_DIR, 0o1777)
+    except FileExistsError:
+        return
+    # The mode given to mkdir is limited by the umask
+    os.chmod(_HOST_LOCK_DIR, 0o1777)
+
+
+def _open_lock_file(lock_path: str) -> typing.BinaryIO:
+    """Opens a lock file for writing, creating it so that every user can lock it.
+
+    Existing files are opened without ``O_CREAT``, which Linux refuses for files of
+    other users in a shared directory with ``fs.protected_regular``.
+
+    Args:
+        lock_path: The lock file.
+
+    Returns:
+        The open file.
+    """
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_RDWR)
+        except FileNotFoundError:
+            pass
+        else:
+            return os.fdopen(fd, "r+b")
+
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o666)
+        except FileExistsError:
+            continue
+        # The mode given to open is limited by the umask
+        with contextlib.suppress(OSError):
+            os.fchmod(fd, 0o666)
+        return os.fdopen(fd, "r+b")
+
+
+def _read_stale_lease(lease_path: str) -> str | None:
+    """Reads a lease whose holder has stopped running or refreshing it.
+
+    Args:
+        lease_path: The lease file.
+
+    Returns:
+        An identifier of the lease, made of its inode, modification time and contents,
+        if it can be broken, otherwise None.
+    """
+    try:
+        with open(lease_path) as lease_file:
+            contents = lease_file.read()
+            status = os.fstat(lease_file.fileno())
+        # The lease's modification time is set by the server holding the lease, so
+        # it is compared with that server's clock rather than this machine's
+        age = _server_time(os.path.dirname(lease_path)) - status.st_mtime
+    except OSError:
+        return None
+
+    stale_lease = f"{status.st_ino}:{status.st_mtime_ns}:{contents}"
+    if age > LEASE_TIMEOUT:
+        return stale_lease
+
+    try:
+        holder = json.loads(contents)
+    except ValueError:
+        # The holder is still writing the lease
+        return None
+
+    if (
+        isinstance(holder, dict)
+        and holder.get("host") == socket.gethostname()
+        and isinstance(holder.get("pid"), int)
+        and not _is_running(holder["pid"])
+    ):
+        return stale_lease
+
+    return None
+
+
+def _refresh_lease(lease_path: str, stop: threading.Event) -> None:
+    """Keeps a held lease from becoming stale until told to stop.
+
+    Args:
+        lease_path: The lease file.
+        stop: Set when the lease is about to be released.
+    """
+    while not stop.wait(LEASE_TIMEOUT / 4):
+        with contextlib.suppress(OSError):
+            os.utime(lease_path)
+
+
+def _release_lease(lease_path: str) -> None:
+    """Removes a held lease.
+
+    Args:
+        lease_path: The lease file.
+    """
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(lease_path)
+
+
+def _remove_if_expired(path: str, unique_path: str) -> None:
+    """Removes a file that hasn't been modified for longer than a lease lasts, such
+    as the marker of a breaker that died before breaking its lease.
+
+    Args:
+        path: The file.
+        unique_path: A name that only this thread uses, which the file is renamed to
+            so that only one process removes it.
+    """
+    try:
+        expired = (
+            _server_time(os.path.dirname(path)) - os.stat(path).st_mtime > LEASE_TIMEOUT
+        )
+        if expired:
+            os.rename(path, unique_path)
+            os.remove(unique_path)
+    except OSError:
+        pass
+
+
+def _server_time(directory: str) -> float:
+    """Reads the current time from the clock of the filesystem holding a directory,
+    which may be a server's with an NFS mount.
+
+    Args:
+        directory: The directory.
+
+    Raises:
+        OSError: When a file cannot be created in the directory.
+
+    Returns:
+        The modification time of a newly created file in the directory.
+    """
+    fd, probe_path = tempfile.mkstemp(prefix=".clock-", dir=directory)
+    try:
+        return os.fstat(fd).st_mtime
+    finally:
+        os.close(fd)
+        os.remove(probe_path)
+
+
+@contextlib.contextmanager
+def _thread_lock(lock_base: str, deadline: float | None) -> Iterator[None]:
+    """Holds a lock shared by the threads of this process.
+
+    Args:
+        lock_base: The path of the lock files without their suffixes.
+        deadline: The monotonic time to give up at, or None to wait forever.
+
+    Raises:
+        LockTimeoutError: When the lock cannot be acquired in time.
+    """
+    with _thread_locks_lock:
+        lock = _thread_locks.setdefault(lock_base, threading.Lock())
+
+    if not _acquire_before(lock, deadline):
+        raise LockTimeoutError(f"Timed out waiting for lock: {lock_base}")
+    try:
+        yield
+    finally:
+        lock.release()
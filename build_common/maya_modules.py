@@ -0,0 +1,167 @@
+"""Merging of the Maya modules in a resolved context into a single module directory.
+
+Packages such as mGear and SHAPES each append their root to ``MAYA_MODULE_PATH``, so
+Maya lists every one of those directories and parses every ``.mod`` file in them at
+startup. This combines the ``.mod`` files into one ``merged.mod``, with each module's
+path made absolute, so Maya only needs to scan a single directory.
+
+Merged directories are cached under the ``maya_modules`` directory of the recipe cache,
+keyed by the context's resolve and the module directories' modification times, so a
+context only pays for the merge once. ``MAYA_PACKAGE_PATH``, used by packages such as
+ngSkinTools, is a different format and is left as it is.
+
+Run inside a context to launch a command with the merged directory, or with a saved
+context to print the directory::
+
+    rez-env maya mGear SHAPES -- python maya_modules.py maya
+    python maya_modules.py --rxt CONTEXT
+"""
+from collections.abc import Iterable, Mapping
+import argparse
+import hashlib
+import json
+import os
+import pathlib
+import re
+import subprocess
+import sys
+import tempfile
+
+import recipe_cache
+
+
+# The name of the module file written to each merged directory
+MERGED_MOD_NAME = "merged.mod"
+
+# The environment variable that Maya searches for module files
+MODULE_PATH_ENV_VAR = "MAYA_MODULE_PATH"
+
+# Matches a module definition, capturing everything before the module's path and the
+# path itself, e.g. "+ MAYAVERSION:2024 PLATFORM:linux mGear 4.2.2 ."
+_DEFINITION_PATTERN = re.compile(
+    r"^(?P<head>[+-](?:\s+(?:MAYAVERSION|PLATFORM|LOCALE):\S+)*\s+\S+\s+\S+\s+)"
+    r"(?P<path>\S.*?)\s*$"
+)
+
+
+def merge(module_paths: Iterable[str | os.PathLike], key: str) -> pathlib.Path:
+    """Combines the module files in directories into a single module file, unless a
+    merge with the same key already exists.
+
+    Args:
+        module_paths: The directories that Maya would search for module files, in
+            order.
+        key: Identifies the module directories and their contents.
+
+    Returns:
+        The directory containing the merged module file.
+    """
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    merged_path = recipe_cache.cache_dir().joinpath("maya_modules", digest)
+    mod_path = merged_path.joinpath(MERGED_MOD_NAME)
+    if mod_path.is_file():
+        return merged_path
+
+    sections = []
+    for module_path in module_paths:
+        try:
+            mod_files = sorted(pathlib.Path(module_path).glob("*.mod"))
+        except OSError:
+            continue
+        for mod_file in mod_files:
+            sections.append(_rewrite_paths(mod_file))
+
+    merged_path.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        prefix=MERGED_MOD_NAME, suffix=".tmp", dir=merged_path
+    )
+    try:
+        with os.fdopen(fd, "w") as merged_file:
+            merged_file.write("\n".join(sections))
+        os.replace(temp_path, mod_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return merged_path
+
+
+def merged_module_dir(environ: Mapping[str, str]) -> pathlib.Path | None:
+    """Merges the module directories of a context's environment.
+
+    Args:
+        environ: The environment of the resolved context.
+
+    Returns:
+        The merged directory, or None if the context doesn't add any module
+        directories.
+    """
+    module_paths = [
+        path for path in environ.get(MODULE_PATH_ENV_VAR, "").split(os.pathsep) if path
+    ]
+    if not module_paths:
+        return None
+
+    # Directories are modified when module files are added or removed, e.g. when a
+    # variant is reinstalled
+    key = json.dumps(
+        [
+            environ.get("REZ_USED_RESOLVE", ""),
+            module_paths,
+            recipe_cache.fingerprint(module_paths),
+        ]
+    )
+    return merge(module_paths, key)
+
+
+def _rewrite_paths(mod_file: pathlib.Path) -> str:
+    """Reads a module file, making the path of each module definition absolute as
+    they are relative to the module file.
+
+    Args:
+        mod_file: The module file.
+
+    Returns:
+        The module file's contents.
+    """
+    lines = []
+    with open(mod_file) as mod:
+        for line in mod.read().splitlines():
+            match = _DEFINITION_PATTERN.match(line)
+            if match and not match.group("path").startswith(("$", "%")):
+                path = mod_file.parent.joinpath(match.group("path"))
+                line = match.group("head") + os.path.normpath(path)
+            lines.append(line)
+
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument(
+        "--rxt",
+        help="A saved context to merge instead of the current context",
+    )
+    parser.add_argument(
+        "command",
+        nargs=argparse.REMAINDER,
+        help="A command to run with the merged directory as the only module path",
+    )
+    args = parser.parse_args()
+
+    if args.rxt:
+        from rez.resolved_context import ResolvedContext
+
+        environ = ResolvedContext.load(args.rxt).get_environ()
+    else:
+        environ = dict(os.environ)
+
+    merged_path = merged_module_dir(environ)
+    if not args.command:
+        if merged_path:
+            print(merged_path)
+        sys.exit(0)
+
+    if merged_path:
+        environ[MODULE_PATH_ENV_VAR] = str(merged_path)
+    sys.exit(subprocess.run(args.command, env=environ).returncode)
@@ -1,15 +1,70 @@
 """Common code for packaging Maya.
 """
-from collections.abc import Iterable
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Iterator
+import contextlib
+import dataclasses
+import json
+import os
 import pathlib
-import subprocess
+import re
+import threading
+import time
+import typing
+
+import binary_versions
+import build_flags
+import locks
+import python_packaging
+import qt_packaging
+import recipe_cache
+import subprocesses
+
+if typing.TYPE_CHECKING:
+    from rez.packages import Package
+
+
+# The number of Maya packages whose bin paths are checked at once
+_BIN_PATH_BATCH_SIZE = 4
+
+# The environment variable listing extra directories to search for Maya installations
+SEARCH_ROOTS_ENV_VAR = "REZ_RECIPES_MAYA_SEARCH_ROOTS"
+
+# The environment variable limiting the number of mayapy processes run at once on this
+# host. mayapy isn't limited when it is unset.
+MAYAPY_SLOTS_ENV_VAR = "REZ_RECIPES_MAYAPY_SLOTS"
+
+# The environment variable naming a file that each mayapy run's wait and run times are
+# appended to as JSON lines
+MAYAPY_METRICS_ENV_VAR = "REZ_RECIPES_MAYAPY_METRICS"
+
+# The environment variable that makes plug-ins require Maya's exact internal Python
+NARROW_REQUIREMENTS_ENV_VAR = "REZ_RECIPES_NARROW_REQUIREMENTS"
 
-from rez.packages import (
-    Package,
-    iter_packages,
-)
-from rez.package_order import SortedOrder
-from rez.package_py_utils import exec_command
+# Seconds that mayapy may run for when it loads the Maya libraries, which can wait on
+# plug-ins and the licence
+_MAYAPY_INITIALIZE_TIMEOUT = 600.0
+
+_latest_existing_packages: dict[str, Package] = {}
+
+# The wait and run times of each mayapy run in this process
+_mayapy_metrics: list[dict[str, typing.Any]] = []
+_mayapy_metrics_lock = threading.Lock()
+
+
+@dataclasses.dataclass(frozen=True)
+class MayaInstallation:
+    """A Maya installation found on disk, along with any facts about it that have
+    already been determined by mayapy.
+    """
+
+    year: int
+    bin_path: str
+    python_version: str | None = None
+    Qt_version: str | None = None
+    PySide_module: str | None = None
+    PySide_version: str | None = None
 
 
 def exec_mayapy(
@@ -27,7 +82,7 @@ def exec_mayapy(
         initialize: Loads the Maya libraries.
 
     Raises:
-        InvalidPackageError: When mayapy returns an error code.
+        InvalidPackageError: When mayapy times out or returns an error code.
 
     Returns:
         The computed value.
@@ -43,41 +98,76 @@ def exec_mayapy(
     cached_bin_path = cached_bin_path or get_bin_path()
 
     mayapy_bin = pathlib.Path(cached_bin_path, "mayapy")
-    proc = subprocess.Popen(
-        [mayapy_bin, "-c", "; ".join(src)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
-    out, err = proc.communicate()
-
-    if proc.returncode:
-        from rez.exceptions import InvalidPackageError
-
-        raise InvalidPackageError(
-            f"Error determining package attribute '{attr}':\n{err}"
+    # Loading the Maya libraries rarely times out for a transient reason, so it isn't
+    # retried, which would hold a mayapy slot for twice as long
+    if initialize:
+        timeout, attempts = _MAYAPY_INITIALIZE_TIMEOUT, 1
+    else:
+        timeout, attempts = subprocesses.DEFAULT_TIMEOUT, subprocesses.DEFAULT_ATTEMPTS
+    with _mayapy_slot(attr):
+        out, err = subprocesses.exec_command(
+            attr, [mayapy_bin, "-c", "; ".join(src)], timeout, attempts
         )
 
-    return out.strip()
+    return out
 
 
-def get_bin_path() -> str:
+def get_bin_path(year: int | str | None = None) -> str:
     """Determines Maya's binaries path.
 
+    Args:
+        year: The Maya year to find. Defaults to the highest installed year.
+
     Raises:
         InvalidPackageError: When the bin path cannot be determined.
 
     Returns:
         The path.
     """
-    path = _get_bin_path_from_pacman() or _get_bin_path_from_winreg()
+    for installation in get_installations():
+        if year is None or installation.year == int(year):
+            return installation.bin_path
 
-    if not path:
-        from rez.exceptions import InvalidPackageError
+    from rez.exceptions import InvalidPackageError
 
+    if year is None:
         raise InvalidPackageError("Could not determine Maya's bin path")
+    raise InvalidPackageError(f"Could not determine the bin path for Maya {year}")
+
 
-    return path
+def get_installations() -> list[MayaInstallation]:
+    """Enumerates every Maya installation known to pacman, the Windows registry and
+    the search roots in a single pass. Extra search roots can be provided through the
+    ``REZ_RECIPES_MAYA_SEARCH_ROOTS`` environment variable.
+
+    Returns:
+        The installations, ordered from the highest year to the lowest.
+    """
+    bin_paths: dict[str, int] = {}
+    for year, bin_path in (
+        _get_bin_paths_from_pacman()
+        + _get_bin_paths_from_winreg()
+        + _get_bin_paths_from_search_roots()
+    ):
+        bin_paths.setdefault(os.path.normpath(bin_path), year)
+
+    installations = []
+    for bin_path, year in bin_paths.items():
+        facts = recipe_cache.load("maya_facts", _mayapy_fingerprint(bin_path)) or {}
+        installations.append(
+            MayaInstallation(
+                year=year,
+                bin_path=bin_path,
+                python_version=facts.get("python_version"),
+                Qt_version=facts.get("Qt_version"),
+                PySide_module=facts.get("PySide_module"),
+                PySide_version=facts.get("PySide_version"),
+            )
+        )
+
+    return sorted(
+        installations, key=lambda installation: installation.year, reverse=True
+    )
 
 
 def get_PySide_module(cached_bin_path: str = "") -> str:
@@ -87,22 +177,15 @@ def get_PySide_module(cached_bin_path: str = "") -> str:
         cached_bin_path: The bin path of the mayapy executable to reuse.
 
     Raises:
-        InvalidPackageError: When mayapy returns an error code.
+        InvalidPackageError: When mayapy times out or returns an error code.
 
     Returns:
         The name.
     """
     cached_bin_path = cached_bin_path or get_bin_path()
 
-    return exec_mayapy(
-        "PySide_module",
-        [
-            "import importlib.util",
-            "print('PySide2') if importlib.util.find_spec('PySide2') else None",
-            "print('PySide6') if importlib.util.find_spec('PySide6') else None",
-        ],
-        cached_bin_path,
-        initialize=False,
+    return _cached_fact(
+        "PySide_module", cached_bin_path, lambda: _get_PySide_module(cached_bin_path)
     )
 
 
@@ -115,19 +198,41 @@ def get_PySide_version(PySide_module: str = "", cached_bin_path: str = "") -> st
         cached_bin_path: The bin path of the mayapy executable to reuse.
 
     Raises:
-        InvalidPackageError: When mayapy returns an error code.
+        InvalidPackageError: When mayapy times out or returns an error code.
 
     Returns:
         The version.
     """
-    PySide_module = PySide_module or get_PySide_module()
     cached_bin_path = cached_bin_path or get_bin_path()
+    PySide_module = PySide_module or get_PySide_module(cached_bin_path)
 
-    return exec_mayapy(
+    if PySide_module != get_PySide_module(cached_bin_path):
+        return _get_PySide_version(PySide_module, cached_bin_path)
+
+    return _cached_fact(
         "PySide_version",
-        [f"import {PySide_module}", f"print({PySide_module}.__version__)"],
         cached_bin_path,
-        initialize=False,
+        lambda: _get_PySide_version(PySide_module, cached_bin_path),
+    )
+
+
+def get_site_paths(cached_bin_path: str = "") -> list[str]:
+    """Determines the site-packages directories of Maya's internal Python
+    installation.
+
+    Args:
+        cached_bin_path: The bin path of the mayapy executable to reuse.
+
+    Raises:
+        InvalidPackageError: When mayapy times out or returns an error code.
+
+    Returns:
+        The paths.
+    """
+    cached_bin_path = cached_bin_path or get_bin_path()
+
+    return _cached_fact(
+        "site_paths", cached_bin_path, lambda: _get_site_paths(cached_bin_path)
     )
 
 
@@ -138,21 +243,56 @@ def get_python_version(cached_bin_path: str = "") -> str:
         cached_bin_path: The bin path of the mayapy executable to reuse.
 
     Raises:
-        InvalidPackageError: When mayapy returns an error code.
+        InvalidPackageError: When mayapy times out or returns an error code.
 
     Returns:
         The version.
     """
     cached_bin_path = cached_bin_path or get_bin_path()
 
-    return exec_mayapy(
+    return _cached_fact(
         "python_version",
-        ["import platform", "print(platform.python_version())"],
         cached_bin_path,
-        initialize=False,
+        lambda: _read_python_version(cached_bin_path)
+        or exec_mayapy(
+            "python_version",
+            ["import platform", "print(platform.python_version())"],
+            cached_bin_path,
+            initialize=False,
+        ),
     )
 
 
+def get_mayapy_metrics() -> list[dict[str, typing.Any]]:
+    """Lists how long each mayapy run in this process waited for a slot and ran for.
+
+    Returns:
+        The package attribute, slot, wait time and run time in seconds of each run.
+    """
+    with _mayapy_metrics_lock:
+        return list(_mayapy_metrics)
+
+
+def get_python_requirement(python_version: str) -> str:
+    """Formats a plug-in variant's requirement on Maya's internal Python installation.
+
+    Any Python with the same minor version is accepted by default. When narrow
+    requirements are enabled with the ``REZ_RECIPES_NARROW_REQUIREMENTS`` environment
+    variable or ``-DREZ_RECIPES_NARROW_REQUIREMENTS=ON``, only Maya's internal Python
+    package is accepted, so the solver doesn't need to consider every other Python
+    package with the same minor version.
+
+    Args:
+        python_version: The version of Maya's internal Python installation.
+
+    Returns:
+        The requirement.
+    """
+    if build_flags.enabled(NARROW_REQUIREMENTS_ENV_VAR):
+        return f"python-{python_version}-_maya"
+    return f"python-{python_version.rpartition('.')[0]}"
+
+
 def get_Qt_version(cached_bin_path: str = "") -> str:
     """Determines the version of Maya's internal Qt installation.
 
@@ -165,11 +305,362 @@ def get_Qt_version(cached_bin_path: str = "") -> str:
     Returns:
         The version.
     """
-    import re
+    cached_bin_path = cached_bin_path or get_bin_path()
+
+    return _cached_fact(
+        "Qt_version", cached_bin_path, lambda: _get_Qt_version(cached_bin_path)
+    )
+
+
+def latest_existing_package() -> Package:
+    """Searches the installed Rez packages for the highest Maya package installation
+    with an installation that exists on disk.
+
+    Versions are visited in descending order so that the search can stop at the first
+    match, and the match is cached until one of the package repositories changes.
+
+    Raises:
+        InvalidPackageError: When the ``maya`` package cannot be found.
+
+    Returns:
+        The Maya package.
+    """
+    from rez.packages import get_package
+
+    repositories_key = recipe_cache.family_fingerprint("maya")
+
+    package = _latest_existing_packages.get(repositories_key)
+    if package:
+        return package
+
+    cached_version = recipe_cache.load("latest_existing_package", repositories_key)
+    if cached_version:
+        package = get_package("maya", cached_version)
+        if not package or not _existing_bin_paths([package]):
+            package = None
+
+    if not package:
+        package = _find_latest_existing_package()
+        recipe_cache.store(
+            "latest_existing_package", repositories_key, str(package.version)
+        )
+
+    _latest_existing_packages[repositories_key] = package
+    return package
+
+
+def _cached_fact(
+    fact: str, bin_path: str, compute: Callable[[], typing.Any]
+) -> typing.Any:
+    """Retrieves a fact about a Maya installation, only computing it when it hasn't
+    been cached since mayapy was last modified.
+
+    Args:
+        fact: The name of the fact, matching a :class:`MayaInstallation` field.
+        bin_path: The bin path of the Maya installation.
+        compute: Determines the fact when it isn't cached.
+
+    Returns:
+        The fact.
+    """
+    key = _mayapy_fingerprint(bin_path)
+    facts = recipe_cache.load("maya_facts", key) or {}
+    if fact not in facts:
+        facts[fact] = compute()
+        recipe_cache.store("maya_facts", key, facts)
+    return facts[fact]
+
+
+@contextlib.contextmanager
+def _mayapy_slot(attr: str) -> Iterator[None]:
+    """Holds one of the host's mayapy slots while mayapy runs, and records how long
+    it waited and ran for.
+
+    Args:
+        attr: The name of the package attribute that mayapy is run for.
+
+    Raises:
+        ValueError: When the number of slots isn't an integer.
+    """
+    slots = int(os.environ.get(MAYAPY_SLOTS_ENV_VAR) or 0)
+    start = time.monotonic()
+    with contextlib.ExitStack() as stack:
+        slot = None
+        if slots > 0:
+            slot = stack.enter_context(locks.semaphore("mayapy", slots))
+        acquired = time.monotonic()
+        yield
+
+    metrics = {
+        "attr": attr,
+        "slot": slot,
+        "wait": acquired - start,
+        "run": time.monotonic() - acquired,
+    }
+    with _mayapy_metrics_lock:
+        _mayapy_metrics.append(metrics)
+
+    metrics_path = os.environ.get(MAYAPY_METRICS_ENV_VAR)
+    if metrics_path:
+        with contextlib.suppress(OSError):
+            with open(metrics_path, "a") as metrics_file:
+                metrics_file.write(json.dumps({**metrics, "pid": os.getpid()}) + "\n")
+
+
+def _existing_bin_paths(packages: Iterable[Package]) -> set[str]:
+    """Checks which of the packages' bin paths exist on disk. The checks are run
+    concurrently since each one may be a round-trip to a network mount.
+
+    Args:
+        packages: The Maya packages to check.
+
+    Returns:
+        The bin paths that exist.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    bin_paths = {getattr(package, "_bin_path", None) for package in packages}
+    bin_paths.discard(None)
+    bin_paths.discard("")
+    bin_paths = list(bin_paths)
+
+    with ThreadPoolExecutor(max_workers=max(len(bin_paths), 1)) as executor:
+        exists = executor.map(lambda path: pathlib.Path(path).is_dir(), bin_paths)
+
+    return {path for path, exists_ in zip(bin_paths, exists) if exists_}
+
+
+def _find_latest_existing_package() -> Package:
+    """Walks the Maya packages in descending version order until one is found with an
+    installation that exists on disk.
+
+    Raises:
+        InvalidPackageError: When the ``maya`` package cannot be found.
+
+    Returns:
+        The Maya package.
+    """
+    from rez.packages import iter_packages
+
+    # Sorting only needs the versions, which are known without loading the package
+    # definitions
+    packages = sorted(
+        iter_packages("maya"), key=lambda package: package.version, reverse=True
+    )
+
+    for start in range(0, len(packages), _BIN_PATH_BATCH_SIZE):
+        batch = packages[start : start + _BIN_PATH_BATCH_SIZE]
+        existing_bin_paths = _existing_bin_paths(batch)
+        for package in batch:
+            if getattr(package, "_bin_path", None) in existing_bin_paths:
+                return package
+
     from rez.exceptions import InvalidPackageError
+
+    raise InvalidPackageError(
+        "Could not find a 'maya' package with an installation that exists on disk"
+    )
+
+
+def _get_bin_paths_from_pacman() -> list[tuple[int, str]]:
+    """Determines the binaries paths of every Maya installation managed by the
+    pacman package manager.
+
+    Returns:
+        The years and paths that were found.
+    """
+    try:
+        out, err = subprocesses.exec_command("bin_path", ["pacman", "--query"])
+    except FileNotFoundError:
+        return []
+
+    # Map the names of installed Maya packages, e.g. maya or maya2024, to their years
+    package_years = {}
+    for line in out.split("\n"):
+        name, _, version = line.partition(" ")
+        match = re.fullmatch(r"maya(\d{4})?", name)
+        if match:
+            year = match.group(1) or version.partition(".")[0]
+            if year.isdigit():
+                package_years[name] = int(year)
+
+    if not package_years:
+        return []
+
+    out, err = subprocesses.exec_command(
+        "bin_path", ["pacman", "--query", "--list"] + list(package_years)
+    )
+
+    bin_paths = []
+    for line in out.split("\n"):
+        name, _, path = line.partition(" ")
+        if path.endswith("bin/mayapy"):
+            bin_paths.append((package_years[name], str(pathlib.Path(path).parent)))
+
+    return bin_paths
+
+
+def _get_bin_paths_from_search_roots() -> list[tuple[int, str]]:
+    """Determines the binaries paths of every Maya installation in the default
+    installation directories and any directories listed in the
+    ``REZ_RECIPES_MAYA_SEARCH_ROOTS`` environment variable.
+
+    Returns:
+        The years and paths that were found.
+    """
     from rez.system import system
 
-    cached_bin_path = cached_bin_path or get_bin_path()
+    search_roots = os.environ.get(SEARCH_ROOTS_ENV_VAR, "").split(os.pathsep)
+    if system.platform == "windows":
+        search_roots.append(
+            os.path.join(
+                os.environ.get("ProgramFiles", r"C:\Program Files"), "Autodesk"
+            )
+        )
+        mayapy_subpath = os.path.join("bin", "mayapy.exe")
+    elif system.platform == "osx":
+        search_roots.append("/Applications/Autodesk")
+        mayapy_subpath = os.path.join("Maya.app", "Contents", "bin", "mayapy")
+    else:
+        search_roots.append("/usr/autodesk")
+        mayapy_subpath = os.path.join("bin", "mayapy")
+
+    bin_paths = []
+    for search_root in filter(None, search_roots):
+        try:
+            entries = list(os.scandir(search_root))
+        except OSError:
+            continue
+
+        for entry in entries:
+            match = re.fullmatch(r"maya(\d{4})", entry.name, re.IGNORECASE)
+            if not match:
+                continue
+            mayapy_path = os.path.join(entry.path, mayapy_subpath)
+            if os.path.isfile(mayapy_path):
+                bin_paths.append((int(match.group(1)), os.path.dirname(mayapy_path)))
+
+    return bin_paths
+
+
+def _get_bin_paths_from_winreg() -> list[tuple[int, str]]:
+    """Determines the binaries paths of every Maya installation listed in the Windows
+    registry.
+
+    Returns:
+        The years and paths that were found.
+    """
+    try:
+        import winreg
+    except ModuleNotFoundError:
+        return []
+
+    try:
+        maya_key = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Autodesk\Maya")
+    except OSError:
+        return []
+
+    bin_paths = []
+    with maya_key:
+        key_count, _, _ = winreg.QueryInfoKey(maya_key)
+        for index in range(key_count):
+            year = winreg.EnumKey(maya_key, index)
+            if not year.isdigit():
+                continue
+
+            try:
+                with winreg.OpenKey(
+                    maya_key, year + r"\Setup\InstallPath"
+                ) as install_path_key:
+                    value, _ = winreg.QueryValueEx(
+                        install_path_key, "MAYA_INSTALL_LOCATION"
+                    )
+            except OSError:
+                continue
+
+            bin_paths.append((int(year), str(pathlib.Path(value, "bin"))))
+
+    return bin_paths
+
+
+def _get_PySide_module(cached_bin_path: str) -> str:
+    """Determines the module name of Maya's internal PySide installation by searching
+    its site-packages, falling back to mayapy.
+
+    Args:
+        cached_bin_path: The bin path of the mayapy executable to reuse.
+
+    Raises:
+        InvalidPackageError: When mayapy times out or returns an error code.
+
+    Returns:
+        The name.
+    """
+    for site_path in get_site_paths(cached_bin_path):
+        for PySide_module in ("PySide2", "PySide6"):
+            if os.path.isfile(os.path.join(site_path, PySide_module, "__init__.py")):
+                return PySide_module
+
+    return exec_mayapy(
+        "PySide_module",
+        [
+            "import importlib.util",
+            "print('PySide2') if importlib.util.find_spec('PySide2') else None",
+            "print('PySide6') if importlib.util.find_spec('PySide6') else None",
+        ],
+        cached_bin_path,
+        initialize=False,
+    )
+
+
+def _get_PySide_version(PySide_module: str, cached_bin_path: str) -> str:
+    """Determines the version of a PySide module from its installed metadata, falling
+    back to importing it in mayapy.
+
+    Args:
+        PySide_module: The name of the module to retrieve a version for.
+        cached_bin_path: The bin path of the mayapy executable to reuse.
+
+    Raises:
+        InvalidPackageError: When mayapy times out or returns an error code.
+
+    Returns:
+        The version.
+    """
+    for site_path in get_site_paths(cached_bin_path):
+        if os.path.isdir(os.path.join(site_path, PySide_module)):
+            version = python_packaging.read_module_version(site_path, PySide_module)
+            if version:
+                return version
+
+    return exec_mayapy(
+        "PySide_version",
+        [f"import {PySide_module}", f"print({PySide_module}.__version__)"],
+        cached_bin_path,
+        initialize=False,
+    )
+
+
+def _get_Qt_version(cached_bin_path: str) -> str:
+    """Determines the version of Maya's internal Qt installation from its installed
+    files, falling back to running one of its tools.
+
+    Args:
+        cached_bin_path: The path to search for Qt binaries.
+
+    Raises:
+        InvalidPackageError: When the version can't be determined.
+
+    Returns:
+        The version.
+    """
+    from rez.exceptions import InvalidPackageError
+    from rez.system import system
+
+    version = qt_packaging.read_Qt_version(pathlib.Path(cached_bin_path).parent)
+    if version:
+        return version
+
     suffix = ".exe" if system.platform == "windows" else ""
 
     qt_bin_path = pathlib.Path(cached_bin_path).joinpath("qmake").with_suffix(suffix)
@@ -186,7 +677,7 @@ def get_Qt_version(cached_bin_path: str = "") -> str:
             f"Could not find Qt in Maya bin path: {cached_bin_path}"
         )
 
-    out, err = exec_command("version", [str(qt_bin_path)] + bin_args)
+    out, err = subprocesses.exec_command("version", [str(qt_bin_path)] + bin_args)
     matches = re.search(search_pattern, out)
     if matches:
         return matches.groups(1)[0]
@@ -194,80 +685,109 @@ def get_Qt_version(cached_bin_path: str = "") -> str:
     raise InvalidPackageError(f"Could not determine Qt's version string: {out}")
 
 
-def latest_existing_package() -> Package:
-    """Searches the installed Rez packages for the highest Maya package installation
-    with an installation that exists on disk.
+def _get_site_paths(cached_bin_path: str) -> list[str]:
+    """Determines the site-packages directories of Maya's internal Python installation
+    from the known installation layouts, falling back to mayapy.
+
+    Args:
+        cached_bin_path: The bin path of the mayapy executable to reuse.
 
     Raises:
-        InvalidPackageError: When the ``maya`` package cannot be found.
+        InvalidPackageError: When mayapy times out or returns an error code.
 
     Returns:
-        The Maya package.
+        The paths.
     """
-    packages = []
-    for package in iter_packages("maya"):
-        bin_path = getattr(package, "_bin_path", None)
-        if bin_path and pathlib.Path(bin_path).is_dir():
-            packages.append(package)
-
-    if not packages:
-        from rez.exceptions import InvalidPackageError
-
-        raise InvalidPackageError(
-            "Could not find a 'maya' package with an installation that exists on disk"
-        )
+    import ast
+    import glob
+
+    install_path = pathlib.Path(cached_bin_path).parent
+    patterns = [
+        # Linux
+        install_path.joinpath("lib", "python*", "site-packages"),
+        # Windows
+        install_path.joinpath("Python", "Lib", "site-packages"),
+        # macOS
+        install_path.joinpath(
+            "Frameworks",
+            "Python.framework",
+            "Versions",
+            "Current",
+            "lib",
+            "python*",
+            "site-packages",
+        ),
+    ]
+    for pattern in patterns:
+        site_paths = sorted(glob.glob(str(pattern)))
+        if site_paths:
+            return site_paths
+
+    paths_literal = exec_mayapy(
+        "site_paths",
+        ["import site", "print(site.getsitepackages())"],
+        cached_bin_path,
+        initialize=False,
+    )
+    return ast.literal_eval(paths_literal)
 
-    packages = SortedOrder(descending=True).reorder(packages)
-    return packages[0]
 
+def _mayapy_fingerprint(bin_path: str) -> str:
+    """Generates a cache key for facts about a Maya installation, which changes
+    whenever its mayapy executable is replaced.
 
-def _get_bin_path_from_pacman() -> str | None:
-    """Determines Maya's binaries path from the pacman package manager.
+    Args:
+        bin_path: The bin path of the Maya installation.
 
     Returns:
-        The path, if found.
+        The key.
     """
-    try:
-        out, err = exec_command("bin_path", ["pacman", "--query", "--list", "maya"])
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("bin/mayapy"):
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
+    return recipe_cache.fingerprint(
+        [pathlib.Path(bin_path, "mayapy"), pathlib.Path(bin_path, "mayapy.exe")]
+    )
 
-    return None
 
+def _read_python_version(cached_bin_path: str) -> str | None:
+    """Determines the version of Maya's internal Python installation from its headers
+    or the version string embedded in its shared library, without launching mayapy.
 
-def _get_bin_path_from_winreg() -> str | None:
-    """Determines Maya's binaries path from the Windows registry.
+    Args:
+        cached_bin_path: The bin path of the Maya installation.
 
     Returns:
-        The path, if found.
+        The version, if found.
     """
-    try:
-        import winreg
-    except ModuleNotFoundError:
-        return None
-
-    with winreg.OpenKey(
-        winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Autodesk\Maya"
-    ) as maya_key:
-        # Iterate through the sub-keys to determine the highest Maya installation year
-        key_count, _, _ = winreg.QueryInfoKey(maya_key)
-        max_year = ""
-        for index in range(key_count):
-            year = winreg.EnumKey(maya_key, index)
-            if year.isdigit() and year > max_year:
-                max_year = year
-
-        if not max_year:
-            return None
+    import glob
+
+    install_path = pathlib.Path(cached_bin_path).parent
+
+    for pattern in (
+        install_path.joinpath("include", "python3*", "patchlevel.h"),
+        install_path.joinpath("include", "Python*", "Python", "patchlevel.h"),
+    ):
+        for header_path in glob.glob(str(pattern)):
+            try:
+                text = pathlib.Path(header_path).read_text(errors="replace")
+            except OSError:
+                continue
+            match = re.search(r"#\s*define\s+PY_VERSION\s+\"(\d+\.\d+\.\d+)", text)
+            if match:
+                return match.group(1)
+
+    # Only search libraries whose names include the major and minor versions, since
+    # the embedded version string is too generic to search for on its own
+    for pattern, name_pattern in (
+        (install_path.joinpath("lib", "libpython3.*.so*"), r"libpython3\.(\d+)"),
+        (install_path.joinpath("bin", "python3*.dll"), r"python3(\d+)\.dll"),
+    ):
+        for library_path in glob.glob(str(pattern)):
+            match = re.match(name_pattern, os.path.basename(library_path))
+            if not match:
+                continue
+            version = binary_versions.search(
+                library_path, rb"\x00(3\." + match.group(1).encode() + rb"\.\d+)\x00"
+            )
+            if version:
+                return version
 
-        with winreg.OpenKey(
-            maya_key, max_year + r"\Setup\InstallPath"
-        ) as install_path_key:
-            value, _ = winreg.QueryValueEx(install_path_key, "MAYA_INSTALL_LOCATION")
-
-    return str(pathlib.Path(value, "bin"))
+    return None
@@ -0,0 +1,278 @@
+"""An asynchronous HTTP client for the metadata that recipes fetch while they are
+evaluated, such as release listings.
+
+Requests run on a shared event loop in a background thread, so recipes can use the
+synchronous :func:`fetch` and :func:`fetch_json` wrappers while still overlapping with
+each other. :func:`prefetch` starts requests without waiting for them, which lets a
+process that evaluates several recipes issue all of their fetches up front.
+
+Connections are pooled and reused per host, the number of concurrent requests per host
+is limited, and failed requests are retried with exponential backoff. Responses are
+requested with gzip compression and cached for the lifetime of the process.
+"""
+from collections.abc import Iterable
+import asyncio
+import concurrent.futures
+import gzip
+import http.client
+import json
+import threading
+import typing
+import urllib.parse
+
+
+# The maximum number of concurrent requests to a single host
+MAX_CONNECTIONS_PER_HOST = 4
+
+# The number of attempts made for each request
+MAX_ATTEMPTS = 4
+
+# Seconds to wait for a connection or a response
+TIMEOUT = 30.0
+
+# Seconds to wait before the first retry, which doubles with each attempt
+_BACKOFF = 0.5
+
+# HTTP status codes that are worth retrying
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_USER_AGENT = "rez-recipes"
+
+
+class MetadataError(OSError):
+    """Raised when metadata cannot be fetched."""
+
+
+class _Client:
+    """Runs requests on an event loop in a background thread."""
+
+    def __init__(self):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+
+        # Requests block in http.client, so they run on a thread pool whose size
+        # bounds the total number of open connections
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CONNECTIONS_PER_HOST * 4,
+            thread_name_prefix="metadata_client",
+        )
+        self._lock = threading.Lock()
+        self._responses: dict[str, concurrent.futures.Future] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._idle_connections: dict[str, list[http.client.HTTPConnection]] = {}
+
+    def submit(self, url: str) -> concurrent.futures.Future:
+        """Starts fetching a URL unless it has already been requested.
+
+        Args:
+            url: The URL to fetch.
+
+        Returns:
+            A future resolving to the response body.
+        """
+        with self._lock:
+            future = self._responses.get(url)
+            if future is None or (future.done() and future.exception()):
+                future = asyncio.run_coroutine_threadsafe(self._fetch(url), self._loop)
+                self._responses[url] = future
+            return future
+
+    async def _fetch(self, url: str) -> bytes:
+        """Fetches a URL, retrying transient failures.
+
+        Args:
+            url: The URL to fetch.
+
+        Raises:
+            MetadataError: When every attempt fails.
+
+        Returns:
+            The response body.
+        """
+        host = urllib.parse.urlsplit(url).netloc
+        semaphore = self._semaphores.setdefault(
+            host, asyncio.Semaphore(MAX_CONNECTIONS_PER_HOST)
+        )
+
+        error: Exception | None = None
+        for attempt in range(MAX_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(_BACKOFF * 2 ** (attempt - 1))
+            async with semaphore:
+                try:
+                    return await self._loop.run_in_executor(
+                        self._executor, self._request, url
+                    )
+                except _RetryableError as retryable_error:
+                    error = retryable_error
+                except MetadataError:
+                    # Client errors and redirect loops won't change when retried
+                    raise
+                except (OSError, http.client.HTTPException) as connection_error:
+                    error = connection_error
+
+        raise MetadataError(f"Could not fetch {url}: {error}")
+
+    def _request(self, url: str, redirects: int = 5) -> bytes:
+        """Performs a single request using a pooled connection.
+
+        Args:
+            url: The URL to fetch.
+            redirects: The number of redirects that may still be followed.
+
+        Raises:
+            MetadataError: When the response is a client error, or redirects more
+                times than allowed.
+            _RetryableError: When the response is a transient server error.
+
+        Returns:
+            The response body.
+        """
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        pool_key = f"{parts.scheme}://{parts.netloc}"
+
+        connection = self._checkout(pool_key, parts)
+        try:
+            connection.request(
+                "GET",
+                path,
+                headers={"Accept-Encoding": "gzip", "User-Agent": _USER_AGENT},
+            )
+            response = connection.getresponse()
+            body = response.read()
+        except Exception:
+            connection.close()
+            raise
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(pool_key, connection)
+
+        if response.status in (301, 302, 303, 307, 308):
+            if not redirects:
+                raise MetadataError(f"Too many redirects: {url}")
+            location = urllib.parse.urljoin(url, response.getheader("Location", ""))
+            return self._request(location, redirects - 1)
+        if response.status in _RETRY_STATUSES:
+            raise _RetryableError(f"HTTP {response.status}")
+        if response.status >= 400:
+            raise MetadataError(f"Could not fetch {url}: HTTP {response.status}")
+
+        if response.getheader("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return body
+
+    def _checkin(self, pool_key: str, connection: http.client.HTTPConnection) -> None:
+        """Returns a connection to the pool for reuse.
+
+        Args:
+            pool_key: The scheme and host the connection is for.
+            connection: The idle connection.
+        """
+        with self._lock:
+            self._idle_connections.setdefault(pool_key, []).append(connection)
+
+    def _checkout(
+        self, pool_key: str, parts: urllib.parse.SplitResult
+    ) -> http.client.HTTPConnection:
+        """Takes an idle connection from the pool, or opens a new one.
+
+        Args:
+            pool_key: The scheme and host to connect to.
+            parts: The URL being fetched.
+
+        Returns:
+            The connection.
+        """
+        with self._lock:
+            idle_connections = self._idle_connections.get(pool_key)
+            if idle_connections:
+                return idle_connections.pop()
+
+        if parts.scheme == "https":
+            return http.client.HTTPSConnection(parts.netloc, timeout=TIMEOUT)
+        return http.client.HTTPConnection(parts.netloc, timeout=TIMEOUT)
+
+
+class _RetryableError(Exception):
+    """Raised for responses that may succeed if requested again."""
+
+
+_client: _Client | None = None
+_client_lock = threading.Lock()
+
+
+def fetch(url: str) -> bytes:
+    """Fetches a URL, waiting for the response.
+
+    Args:
+        url: The URL to fetch.
+
+    Raises:
+        MetadataError: When the URL cannot be fetched.
+
+    Returns:
+        The response body.
+    """
+    return _get_client().submit(url).result()
+
+
+def fetch_json(url: str) -> typing.Any:
+    """Fetches and decodes a JSON document, waiting for the response.
+
+    Args:
+        url: The URL to fetch.
+
+    Raises:
+        MetadataError: When the URL cannot be fetched.
+
+    Returns:
+        The decoded document.
+    """
+    return json.loads(fetch(url))
+
+
+def fetch_text(url: str) -> str:
+    """Fetches a text document, waiting for the response.
+
+    Args:
+        url: The URL to fetch.
+
+    Raises:
+        MetadataError: When the URL cannot be fetched.
+
+    Returns:
+        The decoded text.
+    """
+    return fetch(url).decode("utf-8", errors="replace")
+
+
+def prefetch(urls: Iterable[str]) -> None:
+    """Starts fetching URLs in the background, so that later calls to :func:`fetch`
+    for them return sooner.
+
+    Args:
+        urls: The URLs to fetch.
+    """
+    client = _get_client()
+    for url in urls:
+        client.submit(url)
+
+
+def _get_client() -> _Client:
+    """Creates the shared client on first use.
+
+    Returns:
+        The client.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = _Client()
+        return _client
@@ -0,0 +1,44 @@
+"""Cached queries against the pacman package manager.
+
+Results are cached until pacman's local database is modified, which happens whenever a
+package is installed, upgraded or removed.
+"""
+import recipe_cache
+import subprocesses
+
+
+# The directory that pacman updates whenever the installed packages change
+LOCAL_DB_PATH = "/var/lib/pacman/local"
+
+
+def list_files(package: str) -> list[str] | None:
+    """Lists the files owned by a package.
+
+    Args:
+        package: The name of the package.
+
+    Returns:
+        The paths, or None if pacman is unavailable or the package isn't installed.
+    """
+    from rez.exceptions import InvalidPackageError
+
+    key = f"{package}:{recipe_cache.fingerprint(LOCAL_DB_PATH)}"
+    paths = recipe_cache.load("pacman_files", key)
+    if paths is not None:
+        return paths
+
+    try:
+        out, err = subprocesses.exec_command(
+            "pacman", ["pacman", "--query", "--list", package]
+        )
+    except (FileNotFoundError, InvalidPackageError):
+        # pacman returns an error code when the package isn't installed
+        return None
+
+    paths = [
+        line.partition(" ")[2]
+        for line in out.split("\n")
+        if line.startswith(package + " ")
+    ]
+    recipe_cache.store("pacman_files", key, paths)
+    return paths
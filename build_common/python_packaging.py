@@ -0,0 +1,256 @@
+"""Common code for packaging Python installations.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import typing
+
+import recipe_cache
+import subprocesses
+
+if typing.TYPE_CHECKING:
+    from rez.packages import Package
+
+
+# Prints everything the python recipes need to know about an interpreter at once
+_PROBE_SRC = "; ".join(
+    [
+        "import json",
+        "import os",
+        "import platform",
+        "import site",
+        "import sys",
+        (
+            "print(json.dumps({"
+            "'bin_path': os.path.dirname(sys.executable), "
+            "'version': platform.python_version(), "
+            "'site_paths': site.getsitepackages()"
+            "}))"
+        ),
+    ]
+)
+
+
+_site_modules: dict[str, tuple[Package, str]] = {}
+
+
+def find_site_module(module: str) -> tuple[Package, str]:
+    """Finds the Rez python package whose site paths contain a module, along with the
+    module's version. Unlike `rez.package_py_utils.find_site_python
+    <https://rez.readthedocs.io/en/stable/api/rez.package_py_utils.html#rez.package_py_utils.find_site_python>`_,
+    nothing is imported and no interpreters are launched; the site paths are searched
+    on disk and the version is read from the installed metadata. The result is cached
+    until a python package is added or removed.
+
+    Args:
+        module: The name of the top-level module, e.g. ``PySide2``.
+
+    Raises:
+        InvalidPackageError: When the module or its version cannot be found.
+
+    Returns:
+        The python package and the module's version.
+    """
+    from rez.packages import get_package
+
+    key = f"{module}:{recipe_cache.family_fingerprint('python')}"
+
+    result = _site_modules.get(key)
+    if result:
+        return result
+
+    cached = recipe_cache.load("site_modules", key)
+    if cached:
+        python_version, site_path, site_fingerprint, version = cached
+        # Upgrading the module adds and removes metadata in the site path
+        if site_fingerprint == recipe_cache.fingerprint(site_path):
+            package = get_package("python", python_version)
+            if package:
+                result = (package, version)
+
+    if not result:
+        python_version, site_path, version = _search_site_module(module)
+        result = (get_package("python", python_version), version)
+        recipe_cache.store(
+            "site_modules",
+            key,
+            [python_version, site_path, recipe_cache.fingerprint(site_path), version],
+        )
+
+    _site_modules[key] = result
+    return result
+
+
+def probe_interpreter(executable: str = "python") -> dict:
+    """Determines the binaries path, version and site paths of a Python interpreter
+    with a single launch. The result is cached until the executable is replaced.
+
+    Args:
+        executable: The name or path of the interpreter.
+
+    Raises:
+        InvalidPackageError: When the interpreter cannot be found, times out or
+            returns an error code.
+
+    Returns:
+        A dictionary with ``bin_path``, ``version`` and ``site_paths`` keys.
+    """
+    from rez.exceptions import InvalidPackageError
+
+    executable_path = shutil.which(executable)
+    if not executable_path:
+        raise InvalidPackageError(f"Could not find the Python executable: {executable}")
+
+    key = recipe_cache.fingerprint([executable_path, os.path.realpath(executable_path)])
+    facts = recipe_cache.load("python_probes", key)
+    if facts:
+        return facts
+
+    try:
+        proc = subprocesses.run([executable_path, "-c", _PROBE_SRC])
+    except subprocess.TimeoutExpired as error:
+        raise InvalidPackageError(
+            f"Timed out probing Python executable '{executable}': "
+            f"{subprocesses.format_timeout(error)}"
+        ) from None
+
+    if proc.returncode:
+        raise InvalidPackageError(
+            f"Error probing Python executable '{executable}':\n{proc.stderr}"
+        )
+
+    facts = json.loads(proc.stdout)
+    recipe_cache.store("python_probes", key, facts)
+    return facts
+
+
+def read_module_version(site_path: str, module: str) -> str | None:
+    """Reads the version of an installed module from its distribution metadata,
+    falling back to the ``_config.py`` file that PySide generates.
+
+    Args:
+        site_path: The site-packages directory containing the module.
+        module: The name of the top-level module.
+
+    Returns:
+        The version, if found.
+    """
+    normalized_module = _normalize_name(module)
+
+    try:
+        entries = os.listdir(site_path)
+    except OSError:
+        entries = []
+
+    for entry in entries:
+        stem, extension = os.path.splitext(entry)
+        if extension not in (".dist-info", ".egg-info"):
+            continue
+        name, _, version = stem.partition("-")
+        if _normalize_name(name) != normalized_module:
+            continue
+
+        metadata_name = "METADATA" if extension == ".dist-info" else "PKG-INFO"
+        version = (
+            _read_metadata_version(os.path.join(site_path, entry, metadata_name))
+            or version.partition("-")[0]
+        )
+        if version:
+            return version
+
+    config_path = os.path.join(site_path, module, "_config.py")
+    try:
+        with open(config_path) as config_file:
+            match = re.search(
+                r"^version\s*=\s*[\"']([^\"']+)[\"']", config_file.read(), re.MULTILINE
+            )
+    except OSError:
+        return None
+
+    return match.group(1) if match else None
+
+
+def _has_module_dir(site_path: str, module: str) -> bool:
+    """Checks whether a site-packages directory contains a module package.
+
+    Args:
+        site_path: The site-packages directory.
+        module: The name of the top-level module.
+
+    Returns:
+        True if the module's ``__init__.py`` exists.
+    """
+    return os.path.isfile(os.path.join(site_path, module, "__init__.py"))
+
+
+def _normalize_name(name: str) -> str:
+    """Normalizes a distribution name for comparisons, as described in `PEP 503
+    <https://peps.python.org/pep-0503/#normalized-names>`_.
+
+    Args:
+        name: The distribution name.
+
+    Returns:
+        The normalized name.
+    """
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _read_metadata_version(metadata_path: str) -> str | None:
+    """Reads the version from the headers of a distribution's metadata file.
+
+    Args:
+        metadata_path: The ``METADATA`` or ``PKG-INFO`` file.
+
+    Returns:
+        The version, if found.
+    """
+    try:
+        with open(metadata_path, encoding="utf-8") as metadata_file:
+            for line in metadata_file:
+                if not line.strip():
+                    # The headers end at the first blank line
+                    break
+                if line.startswith("Version:"):
+                    return line.partition(":")[2].strip()
+    except OSError:
+        pass
+
+    return None
+
+
+def _search_site_module(module: str) -> tuple[str, str, str]:
+    """Searches every python package's site paths for a module.
+
+    Args:
+        module: The name of the top-level module.
+
+    Raises:
+        InvalidPackageError: When the module or its version cannot be found.
+
+    Returns:
+        The python package's version, the site path and the module's version.
+    """
+    from rez.exceptions import InvalidPackageError
+    from rez.packages import iter_packages
+
+    for package in iter_packages("python"):
+        for site_path in getattr(package, "_site_paths", None) or []:
+            if not _has_module_dir(site_path, module):
+                continue
+
+            version = read_module_version(site_path, module)
+            if not version:
+                raise InvalidPackageError(
+                    f"Could not determine the version of '{module}' in: {site_path}"
+                )
+            return str(package.version), site_path, version
+
+    raise InvalidPackageError(
+        f"Failed to find python installation containing the module '{module}'. Has "
+        "python been installed as a rez package?"
+    )
@@ -0,0 +1,128 @@
+"""Common code for packaging Qt installations.
+
+Qt's version can be read from files that are installed alongside it, which avoids
+launching Qt tools such as qtdiag that may need a display.
+"""
+import os
+import pathlib
+import re
+
+import binary_versions
+
+
+# Headers that define the version, relative to the installation root
+_HEADER_SUBPATHS = [
+    f"{include_dir}/QtCore/{header}"
+    # Arch Linux installs the Qt 5 headers into include/qt
+    for include_dir in ("include", "include/qt", "include/qt6")
+    for header in ("qconfig.h", "qtcore-config.h", "qtversion.h", "qglobal.h")
+]
+
+# CMake package version files, relative to the installation root
+_CMAKE_SUBPATHS = [
+    "lib/cmake/Qt6Core/Qt6CoreConfigVersion.cmake",
+    "lib/cmake/Qt5Core/Qt5CoreConfigVersion.cmake",
+]
+
+# Core libraries, relative to the installation root
+_LIBRARY_SUBPATHS = [
+    "lib/libQt6Core.so.6",
+    "lib/libQt5Core.so.5",
+    "lib64/libQt6Core.so.6",
+    "lib64/libQt5Core.so.5",
+    "bin/Qt6Core.dll",
+    "bin/Qt5Core.dll",
+    "Frameworks/QtCore.framework/Versions/A/QtCore",
+    "Frameworks/QtCore.framework/Versions/5/QtCore",
+]
+
+# The build description embedded in QtCore, e.g. "Qt 5.15.2 (x86_64-little_endian..."
+_LIBRARY_VERSION_PATTERN = re.compile(rb"Qt (\d+\.\d+\.\d+) \(")
+
+
+def read_Qt_version(
+    install_path: str | os.PathLike, major: int | None = None
+) -> str | None:
+    """Determines the version of a Qt installation without running any of its tools.
+    The headers and CMake files are checked first, followed by the core library.
+
+    Args:
+        install_path: The root of the installation, e.g. the parent of its bin path.
+        major: Only accept versions with this major version, for installation roots
+            that are shared between Qt versions such as ``/usr``.
+
+    Returns:
+        The version, if found.
+    """
+    install_path = pathlib.Path(install_path)
+
+    for subpaths, read_version in (
+        (_HEADER_SUBPATHS, _read_header_version),
+        (_CMAKE_SUBPATHS, _read_cmake_version),
+        (_LIBRARY_SUBPATHS, _read_library_version),
+    ):
+        for subpath in subpaths:
+            version = read_version(install_path.joinpath(subpath))
+            if version and (major is None or version.startswith(f"{major}.")):
+                return version
+
+    return None
+
+
+def _read_cmake_version(path: pathlib.Path) -> str | None:
+    """Reads the version from a CMake package version file.
+
+    Args:
+        path: The ``Qt5CoreConfigVersion.cmake`` file.
+
+    Returns:
+        The version, if found.
+    """
+    try:
+        text = path.read_text()
+    except OSError:
+        return None
+
+    match = re.search(r"set\(PACKAGE_VERSION\s+\"?(\d+\.\d+\.\d+)", text)
+    return match.group(1) if match else None
+
+
+def _read_header_version(path: pathlib.Path) -> str | None:
+    """Reads the version from a header defining either ``QT_VERSION_STR`` or the
+    ``QT_VERSION_MAJOR``, ``QT_VERSION_MINOR`` and ``QT_VERSION_PATCH`` macros.
+
+    Args:
+        path: The header file.
+
+    Returns:
+        The version, if found.
+    """
+    try:
+        text = path.read_text(errors="replace")
+    except OSError:
+        return None
+
+    match = re.search(r"#\s*define\s+QT_VERSION_STR\s+\"(\d+\.\d+\.\d+)\"", text)
+    if match:
+        return match.group(1)
+
+    parts = []
+    for part in ("MAJOR", "MINOR", "PATCH"):
+        match = re.search(rf"#\s*define\s+QT_VERSION_{part}\s+(\d+)", text)
+        if not match:
+            return None
+        parts.append(match.group(1))
+
+    return ".".join(parts)
+
+
+def _read_library_version(path: pathlib.Path) -> str | None:
+    """Searches a core library for its embedded build description.
+
+    Args:
+        path: The core library.
+
+    Returns:
+        The version, if found.
+    """
+    return binary_versions.search(path, _LIBRARY_VERSION_PATTERN)
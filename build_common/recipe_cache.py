@@ -0,0 +1,159 @@
+"""Persistent caching for values that are expensive to determine while evaluating
+recipes.
+
+Values are stored as JSON in one file per namespace inside the cache directory, which
+defaults to ``$XDG_CACHE_HOME/rez-recipes`` and can be overridden with the
+``REZ_RECIPES_CACHE_DIR`` environment variable. As keys usually include fingerprints
+that change whenever their paths are modified, each namespace only keeps its most
+recently stored values.
+"""
+from collections.abc import Iterable
+import json
+import os
+import pathlib
+import tempfile
+import typing
+
+import locks
+
+
+CACHE_DIR_ENV_VAR = "REZ_RECIPES_CACHE_DIR"
+
+# Seconds to wait for another process to finish writing a namespace before giving up
+# on caching a value
+LOCK_TIMEOUT = 30.0
+
+# The number of values kept in each namespace, dropping the least recently stored first
+MAX_VALUES = 1000
+
+
+def cache_dir() -> pathlib.Path:
+    """Determines the directory in which cached values are stored.
+
+    Returns:
+        The path.
+    """
+    path = os.environ.get(CACHE_DIR_ENV_VAR)
+    if path:
+        return pathlib.Path(path)
+
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    if xdg_cache_home:
+        return pathlib.Path(xdg_cache_home, "rez-recipes")
+
+    return pathlib.Path.home().joinpath(".cache", "rez-recipes")
+
+
+def family_fingerprint(family: str) -> str:
+    """Generates a key that changes whenever a version of a package family is added to
+    or removed from any of the package repositories.
+
+    Args:
+        family: The name of the package family.
+
+    Returns:
+        The key.
+    """
+    from rez.config import config
+
+    return fingerprint(pathlib.Path(path, family) for path in config.packages_path)
+
+
+def fingerprint(paths: Iterable[str | os.PathLike] | str | os.PathLike) -> str:
+    """Generates a key that changes whenever any of the given paths are modified.
+
+    Args:
+        paths: The paths to stat. Missing paths are included in the key as missing.
+
+    Returns:
+        The key.
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+
+    parts = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            parts.append([os.fspath(path), None, None])
+        else:
+            parts.append([os.fspath(path), stat.st_size, stat.st_mtime_ns])
+
+    return json.dumps(parts, separators=(",", ":"))
+
+
+def load(namespace: str, key: str) -> typing.Any:
+    """Retrieves a cached value.
+
+    Args:
+        namespace: The group of values to search.
+        key: The key the value was stored with.
+
+    Returns:
+        The value, or None if it has not been cached.
+    """
+    return _read(namespace).get(key)
+
+
+def store(namespace: str, key: str, value: typing.Any) -> None:
+    """Caches a value. Failures to write the cache are ignored since the value can
+    always be determined again.
+
+    Concurrent writers are serialized so that none of their values are lost, while
+    readers never need to wait. Once a namespace holds ``MAX_VALUES`` values, the least
+    recently stored are dropped.
+
+    Args:
+        namespace: The group of values to update.
+        key: The key to store the value with.
+        value: A JSON-serializable value.
+    """
+    path = _namespace_path(namespace)
+    try:
+        with locks.locked(path, timeout=LOCK_TIMEOUT):
+            values = _read(namespace)
+            # Values are kept in the order they were stored, most recent last
+            values.pop(key, None)
+            values[key] = value
+            for stale_key in list(values)[:-MAX_VALUES]:
+                del values[stale_key]
+
+            # Write to a temporary file first so that readers never see a partial file
+            with tempfile.NamedTemporaryFile(
+                "w", dir=path.parent, prefix=path.name, suffix=".tmp", delete=False
+            ) as temp_file:
+                json.dump(values, temp_file)
+            os.replace(temp_file.name, path)
+    except OSError:
+        pass
+
+
+def _namespace_path(namespace: str) -> pathlib.Path:
+    """Determines the file in which a namespace's values are stored.
+
+    Args:
+        namespace: The group of values.
+
+    Returns:
+        The path.
+    """
+    return cache_dir().joinpath(namespace + ".json")
+
+
+def _read(namespace: str) -> dict[str, typing.Any]:
+    """Reads all of the values cached for a namespace.
+
+    Args:
+        namespace: The group of values.
+
+    Returns:
+        The values.
+    """
+    try:
+        with open(_namespace_path(namespace)) as cache_file:
+            values = json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+    return values if isinstance(values, dict) else {}
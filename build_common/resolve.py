@@ -0,0 +1,160 @@
+"""Evaluates every recipe in the repository in a single process and writes the
+values that they probe for to a lockfile in each recipe's directory.
+
+Recipes are evaluated concurrently, so they share the probe caches of the packaging
+modules, the pacman file lists and the metadata client's connections instead of each
+paying for them in a separate ``rez-build`` process. Recipes that fail to evaluate are
+reported and don't get a lockfile. See ``lockfiles.py`` for how recipes read their
+lockfiles.
+
+Arguments that recipes read from ``rez-build``, such as ``-DMAYA_YEAR=2024``, can be
+passed through::
+
+    python build_common/resolve.py [RECIPE ...] [-D NAME=VALUE ...]
+"""
+from collections.abc import Iterable
+import argparse
+import concurrent.futures
+import json
+import os
+import pathlib
+import sys
+import typing
+
+import lockfiles
+import maya_packaging
+
+
+# The repository containing the recipes
+REPOSITORY_PATH = pathlib.Path(__file__).resolve().parent.parent
+
+
+def find_recipes(root: str | os.PathLike = REPOSITORY_PATH) -> list[pathlib.Path]:
+    """Finds every recipe in a repository.
+
+    Args:
+        root: The repository to search.
+
+    Returns:
+        The directories containing each recipe's package.py.
+    """
+    return sorted(
+        package_path.parent
+        for package_path in pathlib.Path(root).glob("*/*/package.py")
+    )
+
+
+def resolve(recipe: str | os.PathLike) -> pathlib.Path:
+    """Evaluates a recipe and writes its lockfile.
+
+    Args:
+        recipe: The directory containing the recipe's package.py.
+
+    Returns:
+        The path of the lockfile.
+    """
+    from rez.packages import get_developer_package
+
+    with lockfiles.recording() as probes:
+        package = get_developer_package(str(recipe))
+
+    attributes = {
+        key: value
+        for key, value in package.data.items()
+        if key != "name" and _is_serializable(value)
+    }
+    probes = {key: value for key, value in probes.items() if _is_serializable(value)}
+    return lockfiles.write(recipe, package.name, attributes, probes)
+
+
+def resolve_all(
+    recipes: Iterable[str | os.PathLike], jobs: int | None = None
+) -> dict[pathlib.Path, pathlib.Path | Exception]:
+    """Evaluates recipes concurrently and writes their lockfiles.
+
+    Args:
+        recipes: The directories containing each recipe's package.py.
+        jobs: The maximum number of recipes to evaluate at once.
+
+    Returns:
+        The path of each recipe's lockfile, or the error raised while evaluating it.
+    """
+    results = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {
+            executor.submit(resolve, recipe): pathlib.Path(recipe) for recipe in recipes
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as error:
+                results[futures[future]] = error
+
+    return results
+
+
+def _is_serializable(value: typing.Any) -> bool:
+    """Determines whether an evaluated attribute can be written to a lockfile.
+    Functions evaluated later, such as ``commands``, can't be.
+
+    Args:
+        value: The attribute's value.
+
+    Returns:
+        True if the value can be encoded as JSON.
+    """
+    try:
+        json.dumps(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n\n")[0])
+    parser.add_argument(
+        "recipes",
+        nargs="*",
+        type=pathlib.Path,
+        help="The recipe directories to evaluate. Defaults to every recipe",
+    )
+    parser.add_argument(
+        "-D",
+        action="append",
+        default=[],
+        dest="definitions",
+        metavar="NAME=VALUE",
+        help="An argument to pass to the recipes as if given to rez-build",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="The maximum number of recipes to evaluate at once",
+    )
+    args = parser.parse_args()
+
+    # Recipes parse rez-build's arguments from sys.argv
+    sys.argv[1:] = [f"-D{definition}" for definition in args.definitions]
+
+    failed = False
+    results = resolve_all(args.recipes or find_recipes(), jobs=args.jobs)
+    for recipe, result in sorted(results.items()):
+        if isinstance(result, Exception):
+            failed = True
+            print(f"Could not resolve {recipe}: {result}", file=sys.stderr)
+        else:
+            print(f"Resolved {recipe}: {result}")
+
+    # Report how long recipes waited for mayapy slots, to help tune
+    # REZ_RECIPES_MAYAPY_SLOTS
+    mayapy_metrics = maya_packaging.get_mayapy_metrics()
+    if mayapy_metrics:
+        waits = [metrics["wait"] for metrics in mayapy_metrics]
+        runs = [metrics["run"] for metrics in mayapy_metrics]
+        print(
+            f"Ran mayapy {len(mayapy_metrics)} times for {sum(runs):.1f}s, waiting"
+            f" {sum(waits):.1f}s in total and at most {max(waits):.1f}s for a slot"
+        )
+
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,216 @@
+"""Running of the commands that recipes use to determine package attributes, such as
+mayapy, pacman, qmake and Python interpreters.
+
+Each command runs with a timeout, so a command that hangs, e.g. waiting for a licence
+server or a display, fails the build instead of blocking it forever. Commands run in
+their own process group, or session on POSIX, and the whole group is killed when the
+command times out or the build is interrupted, so no orphaned children are left
+running. Commands that time out are retried a bounded number of times, as a timeout is
+often caused by a transient load on the host, whereas an error code is not retried.
+
+Timeouts can be scaled for slow hosts with the ``REZ_RECIPES_SUBPROCESS_TIMEOUT_SCALE``
+environment variable.
+"""
+from collections.abc import Mapping, Sequence
+import os
+import signal
+import subprocess
+import sys
+import time
+
+
+# Seconds that a command may run for when no timeout is given
+DEFAULT_TIMEOUT = 120.0
+
+# The number of times a command is run before a timeout is reported
+DEFAULT_ATTEMPTS = 2
+
+# The environment variable that multiplies every timeout
+TIMEOUT_SCALE_ENV_VAR = "REZ_RECIPES_SUBPROCESS_TIMEOUT_SCALE"
+
+# Seconds to wait before retrying a command that timed out, doubled for each retry
+_RETRY_DELAY = 1.0
+
+
+def run(
+    cmd: Sequence[str | os.PathLike],
+    timeout: float = DEFAULT_TIMEOUT,
+    attempts: int = DEFAULT_ATTEMPTS,
+    env: Mapping[str, str] | None = None,
+) -> subprocess.CompletedProcess:
+    """Runs a command and captures its output, killing it and all of its children if
+    it takes too long.
+
+    Args:
+        cmd: The command and its arguments.
+        timeout: The number of seconds that each attempt may run for, before scaling.
+        attempts: The number of times to run the command before giving up on it
+            timing out.
+        env: The command's environment. Defaults to this process' environment.
+
+    Raises:
+        ValueError: When there are no attempts.
+        FileNotFoundError: When the command cannot be found.
+        subprocess.TimeoutExpired: When every attempt timed out.
+
+    Returns:
+        The completed process, whose return code is not checked.
+    """
+    if attempts < 1:
+        raise ValueError(f"At least one attempt is needed, not {attempts}")
+
+    timeout *= timeout_scale()
+
+    for attempt in range(attempts):
+        try:
+            return _run_once(cmd, timeout, env)
+        except subprocess.TimeoutExpired:
+            if attempt + 1 >= attempts:
+                raise
+            time.sleep(_RETRY_DELAY * 2**attempt)
+
+
+def exec_command(
+    attr: str,
+    cmd: Sequence[str | os.PathLike],
+    timeout: float = DEFAULT_TIMEOUT,
+    attempts: int = DEFAULT_ATTEMPTS,
+) -> tuple[str, str]:
+    """Uses a command to determine a package attribute, in place of rez's
+    ``exec_command()`` which waits for the command forever.
+
+    Args:
+        attr: The name of the package attribute.
+        cmd: The command and its arguments.
+        timeout: The number of seconds that each attempt may run for, before scaling.
+        attempts: The number of times to run the command before giving up on it
+            timing out.
+
+    Raises:
+        ValueError: When there are no attempts.
+        FileNotFoundError: When the command cannot be found.
+        InvalidPackageError: When the command times out or returns an error code.
+
+    Returns:
+        The command's stripped output and error output.
+    """
+    from rez.exceptions import InvalidPackageError
+
+    try:
+        proc = run(cmd, timeout, attempts)
+    except subprocess.TimeoutExpired as error:
+        raise InvalidPackageError(
+            f"Timed out determining package attribute '{attr}': {format_timeout(error)}"
+        ) from None
+
+    if proc.returncode:
+        raise InvalidPackageError(
+            f"Error determining package attribute '{attr}':\n{proc.stderr}"
+        )
+
+    return proc.stdout.strip(), proc.stderr.strip()
+
+
+def format_timeout(error: subprocess.TimeoutExpired) -> str:
+    """Describes a command that timed out, for error messages.
+
+    Args:
+        error: The timeout raised by ``run()``.
+
+    Returns:
+        The description, including any error output written before it was killed.
+    """
+    cmd = error.cmd
+    if not isinstance(cmd, (str, bytes)):
+        cmd = subprocess.list2cmdline([os.fspath(arg) for arg in cmd])
+
+    message = f"{cmd} did not finish within {error.timeout:g} seconds"
+    stderr = error.stderr
+    if isinstance(stderr, bytes):
+        stderr = stderr.decode(errors="replace")
+    if stderr:
+        message += f":\n{stderr}"
+    return message
+
+
+def timeout_scale() -> float:
+    """Reads the factor that every timeout is multiplied by.
+
+    Returns:
+        The factor, which defaults to 1.
+    """
+    try:
+        scale = float(os.environ.get(TIMEOUT_SCALE_ENV_VAR, ""))
+    except ValueError:
+        return 1.0
+    return scale if scale > 0 else 1.0
+
+
+def _kill_tree(proc: subprocess.Popen) -> None:
+    """Kills a process started by ``_run_once()`` along with all of its children.
+
+    Args:
+        proc: The process, which leads its own process group.
+    """
+    if sys.platform == "win32":
+        subprocess.run(
+            ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    # The group may have exited on its own, or taskkill may not be available
+    if proc.poll() is None:
+        proc.kill()
+
+
+def _run_once(
+    cmd: Sequence[str | os.PathLike], timeout: float, env: Mapping[str, str] | None
+) -> subprocess.CompletedProcess:
+    """Runs a command once in its own process group.
+
+    Args:
+        cmd: The command and its arguments.
+        timeout: The number of seconds that the command may run for.
+        env: The command's environment.
+
+    Raises:
+        FileNotFoundError: When the command cannot be found.
+        subprocess.TimeoutExpired: When the command timed out and was killed.
+
+    Returns:
+        The completed process.
+    """
+    if sys.platform == "win32":
+        group_kwargs = {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group_kwargs = {"start_new_session": True}
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=env,
+        **group_kwargs,
+    )
+    with proc:
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_tree(proc)
+            # Children that inherited the pipes are dead too, so this doesn't block
+            out, err = proc.communicate()
+            raise subprocess.TimeoutExpired(cmd, timeout, out, err) from None
+        except BaseException:
+            # The group doesn't receive the terminal's interrupts, so it is killed
+            # when the build is interrupted
+            _kill_tree(proc)
+            raise
+
+    return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
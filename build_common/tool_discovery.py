@@ -0,0 +1,74 @@
+"""Discovery of the tools provided by an installation's binaries directories.
+
+Each directory is listed once with :func:`os.scandir`, which can usually tell files
+apart from directories without a separate stat call per entry. Listings are cached
+until the directory is modified, so that repeated evaluations of a recipe only need to
+stat the directory itself.
+"""
+from collections.abc import Iterable
+import os
+
+import recipe_cache
+
+
+_listings: dict[str, frozenset[str]] = {}
+
+
+def find_tools(
+    directory: str | os.PathLike, candidates: Iterable[str], suffix: str = ""
+) -> list[str]:
+    """Filters a list of potential tools to those that exist in a directory.
+
+    Args:
+        directory: The directory containing the tools.
+        candidates: The names of the potential tools, without the suffix.
+        suffix: The file extension of executables on this platform, e.g. ``.exe``.
+
+    Returns:
+        The names of the tools that exist, in the order they were given.
+    """
+    file_names = list_files(directory)
+    return [tool for tool in candidates if tool + suffix in file_names]
+
+
+def list_files(directory: str | os.PathLike) -> frozenset[str]:
+    """Lists the names of the files in a directory.
+
+    Args:
+        directory: The directory to list.
+
+    Returns:
+        The file names, or an empty set if the directory cannot be listed.
+    """
+    directory = os.fspath(directory)
+    key = recipe_cache.fingerprint(directory)
+
+    file_names = _listings.get(key)
+    if file_names is not None:
+        return file_names
+
+    cached_file_names = recipe_cache.load("directory_listings", key)
+    if cached_file_names is not None:
+        file_names = frozenset(cached_file_names)
+    else:
+        file_names = _scan_files(directory)
+        recipe_cache.store("directory_listings", key, sorted(file_names))
+
+    _listings[key] = file_names
+    return file_names
+
+
+def _scan_files(directory: str) -> frozenset[str]:
+    """Lists the names of the files in a directory without caching.
+
+    Args:
+        directory: The directory to list.
+
+    Returns:
+        The file names, or an empty set if the directory cannot be listed.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries if entry.is_file())
+    except OSError:
+        return frozenset()
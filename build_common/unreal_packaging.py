@@ -0,0 +1,276 @@
+"""Common code for packaging Unreal Engine.
+"""
+import dataclasses
+import json
+import os
+import pathlib
+import re
+
+import binary_versions
+import recipe_cache
+import subprocesses
+
+
+# The environment variable listing extra directories to search for engine
+# installations
+SEARCH_ROOTS_ENV_VAR = "REZ_RECIPES_UNREAL_ENGINE_SEARCH_ROOTS"
+
+# The release branch embedded in the engine's binaries, e.g. "++UE5+Release-5.3"
+_BRANCH_VERSION_PATTERN = re.compile(rb"\+\+UE\d+\+Release-(\d+\.\d+)")
+
+
+@dataclasses.dataclass(frozen=True)
+class UnrealEngineInstallation:
+    """An Unreal Engine installation found on disk."""
+
+    version: str
+    bin_path: str
+
+    @property
+    def version_tuple(self) -> tuple[int, ...]:
+        """The version as a tuple of integers for comparisons."""
+        return tuple(int(part) for part in self.version.split("."))
+
+
+def get_installation(version: str | None = None) -> UnrealEngineInstallation:
+    """Determines the Unreal Engine installation to package.
+
+    Args:
+        version: The version to find, which may be a prefix such as ``5.3``. Defaults
+            to the highest installed version.
+
+    Raises:
+        InvalidPackageError: When no matching installation can be found.
+
+    Returns:
+        The installation.
+    """
+    for installation in get_installations():
+        if not version or f"{installation.version}.".startswith(f"{version}."):
+            return installation
+
+    from rez.exceptions import InvalidPackageError
+
+    if not version:
+        raise InvalidPackageError("Could not determine Unreal Engine's bin path")
+    raise InvalidPackageError(
+        f"Could not determine the bin path for Unreal Engine {version}"
+    )
+
+
+def get_installations() -> list[UnrealEngineInstallation]:
+    """Enumerates every Unreal Engine installation known to pacman, the Windows
+    registry and the search roots in a single pass. Extra search roots can be provided
+    through the ``REZ_RECIPES_UNREAL_ENGINE_SEARCH_ROOTS`` environment variable.
+
+    Returns:
+        The installations, ordered from the highest version to the lowest.
+    """
+    bin_paths: dict[str, str] = {}
+    for version, bin_path in (
+        _get_bin_paths_from_pacman()
+        + _get_bin_paths_from_winreg()
+        + _get_bin_paths_from_search_roots()
+    ):
+        bin_paths.setdefault(os.path.normpath(bin_path), version)
+
+    installations = []
+    for bin_path, version in bin_paths.items():
+        # The version data next to the editor is the most precise source
+        version = (
+            read_version_file(bin_path) or version or _read_binary_version(bin_path)
+        )
+        if version and re.fullmatch(r"\d+(\.\d+)*", version):
+            installations.append(
+                UnrealEngineInstallation(version=version, bin_path=bin_path)
+            )
+
+    return sorted(
+        installations, key=lambda installation: installation.version_tuple, reverse=True
+    )
+
+
+def read_version_file(bin_path: str) -> str | None:
+    """Determines Unreal Engine's version from the version data in the bin path. The
+    result is cached until the version data is modified.
+
+    Args:
+        bin_path: The bin path of the engine installation.
+
+    Returns:
+        The version, if found.
+    """
+    version_path = pathlib.Path(bin_path, "UnrealEditor.version")
+    key = recipe_cache.fingerprint(version_path)
+
+    version = recipe_cache.load("unreal_engine_version_files", key)
+    if version:
+        return version
+
+    try:
+        with open(version_path) as version_file:
+            version_data = json.load(version_file)
+    except (OSError, ValueError):
+        return None
+
+    version = ".".join(
+        (
+            str(version_data["MajorVersion"]),
+            str(version_data["MinorVersion"]),
+            str(version_data["PatchVersion"]),
+        )
+    )
+    recipe_cache.store("unreal_engine_version_files", key, version)
+    return version
+
+
+def _binaries_platform() -> str:
+    """Determines the name of the engine's binaries directory for this platform.
+
+    Returns:
+        The name.
+    """
+    from rez.system import system
+
+    if system.platform == "windows":
+        return "Win64"
+    if system.platform == "osx":
+        return "Mac"
+    return "Linux"
+
+
+def _get_bin_paths_from_pacman() -> list[tuple[str, str]]:
+    """Determines the binaries paths of every engine installation managed by the
+    pacman package manager, such as ``unreal-engine`` or ``unreal-engine-5.3``.
+
+    Returns:
+        The versions and paths that were found.
+    """
+    try:
+        out, err = subprocesses.exec_command("bin_path", ["pacman", "--query"])
+    except FileNotFoundError:
+        return []
+
+    package_versions = {}
+    for line in out.split("\n"):
+        name, _, version = line.partition(" ")
+        if re.fullmatch(r"unreal-engine(-[\w.]+)?", name):
+            match = re.match(r"(?:\d+:)?(\d+\.\d+\.\d+)", version)
+            package_versions[name] = match.group(1) if match else ""
+
+    if not package_versions:
+        return []
+
+    out, err = subprocesses.exec_command(
+        "bin_path", ["pacman", "--query", "--list"] + list(package_versions)
+    )
+
+    bin_paths = []
+    for line in out.split("\n"):
+        name, _, path = line.partition(" ")
+        if path.endswith("UnrealEditor") and "Saved" not in path:
+            bin_paths.append((package_versions[name], str(pathlib.Path(path).parent)))
+
+    return bin_paths
+
+
+def _get_bin_paths_from_search_roots() -> list[tuple[str, str]]:
+    """Determines the binaries paths of every engine installation directly inside the
+    directories listed in the ``REZ_RECIPES_UNREAL_ENGINE_SEARCH_ROOTS`` environment
+    variable.
+
+    Returns:
+        The versions and paths that were found.
+    """
+    bin_subpath = os.path.join("Engine", "Binaries", _binaries_platform())
+
+    bin_paths = []
+    for search_root in filter(
+        None, os.environ.get(SEARCH_ROOTS_ENV_VAR, "").split(os.pathsep)
+    ):
+        try:
+            entries = list(os.scandir(search_root))
+        except OSError:
+            continue
+
+        for entry in entries:
+            bin_path = os.path.join(entry.path, bin_subpath)
+            if any(
+                os.path.isfile(os.path.join(bin_path, file_name))
+                for file_name in (
+                    "UnrealEditor.version",
+                    "UnrealEditor",
+                    "UnrealEditor.exe",
+                )
+            ):
+                bin_paths.append(("", bin_path))
+
+    return bin_paths
+
+
+def _get_bin_paths_from_winreg() -> list[tuple[str, str]]:
+    """Determines the binaries paths of every engine installation listed in the
+    Windows registry.
+
+    Returns:
+        The versions and paths that were found.
+    """
+    try:
+        import winreg
+    except ModuleNotFoundError:
+        return []
+
+    version_pattern = re.compile(r"^\d+\.\d+$")
+
+    try:
+        ue_key = winreg.OpenKey(
+            winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\EpicGames\Unreal Engine"
+        )
+    except OSError:
+        return []
+
+    bin_paths = []
+    with ue_key:
+        key_count, _, _ = winreg.QueryInfoKey(ue_key)
+        for index in range(key_count):
+            version = winreg.EnumKey(ue_key, index)
+            if not version_pattern.match(version):
+                continue
+
+            try:
+                with winreg.OpenKey(ue_key, version) as version_key:
+                    value, _ = winreg.QueryValueEx(version_key, "InstalledDirectory")
+            except OSError:
+                continue
+
+            bin_paths.append(
+                (version, str(pathlib.Path(value, "Engine", "Binaries", "Win64")))
+            )
+
+    return bin_paths
+
+
+def _read_binary_version(bin_path: str) -> str | None:
+    """Determines the engine's major and minor version from the release branch name
+    embedded in its binaries, for installations without version data.
+
+    Args:
+        bin_path: The bin path of the engine installation.
+
+    Returns:
+        The version, if found.
+    """
+    for file_name in (
+        "libUnrealEditor-BuildSettings.so",
+        "UnrealEditor-BuildSettings.dll",
+        "UnrealEditor-BuildSettings.dylib",
+        "UnrealEditor",
+        "UnrealEditor.exe",
+    ):
+        version = binary_versions.search(
+            os.path.join(bin_path, file_name), _BRANCH_VERSION_PATTERN
+        )
+        if version:
+            return version
+
+    return None
@@ -0,0 +1,200 @@
+"""Bundling of pure-Python modules into a single zip for faster imports from network
+storage.
+
+Importing from a directory costs filesystem round-trips for every package and module,
+whereas a zip on ``sys.path`` is opened once and its index is kept in memory. Modules
+are stored together with bytecode compiled by the interpreter running this script, so
+they don't need to be compiled on import.
+
+Only top-level modules and packages made entirely of Python files are bundled. Packages
+that contain other files, such as resources read relative to ``__file__`` or native
+extensions, are left on disk, as are modules that Maya looks for as files, such as
+``userSetup.py``.
+
+Bundling is off by default, as it only pays off on network storage such as NFS, where
+each path costs a round-trip; on local disk bundled imports are slightly slower. Measure
+on the package repository in use with ``benchmark_zip_bundles.py``, then enable it by
+setting the ``REZ_RECIPES_ZIP_BUNDLE`` environment variable to a true value, or by
+passing ``-DREZ_RECIPES_ZIP_BUNDLE=ON`` to rez-build. This module
+only depends on the standard library so that it can be run with the interpreter that
+will import the bundle, e.g. mayapy, during a build::
+
+    python zip_bundles.py BUNDLE SOURCE [SOURCE ...]
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import py_compile
+import shutil
+import tempfile
+import zipfile
+
+import build_flags
+
+
+# The environment variable that enables bundling
+ENV_VAR = "REZ_RECIPES_ZIP_BUNDLE"
+
+# The name of the bundle in a package's installation directory
+BUNDLE_NAME = "python.zip"
+
+# Modules that are searched for as files rather than imported
+_KEEP_ON_DISK = {"userSetup"}
+
+# Files that aren't needed at runtime and don't prevent a package from being bundled
+_IGNORED_SUFFIXES = {".pyc", ".pyi", ".pyo"}
+_IGNORED_NAMES = {"__pycache__", "py.typed"}
+
+
+def bundle(
+    bundle_path: str | os.PathLike, sources: list[str | os.PathLike]
+) -> tuple[list[str], list[str]]:
+    """Moves the pure-Python modules and packages at the top level of source
+    directories into a zip.
+
+    Args:
+        bundle_path: The zip to write, which is replaced entirely.
+        sources: The directories that would otherwise be added to ``sys.path``.
+            Directories that don't exist are ignored.
+
+    Raises:
+        py_compile.PyCompileError: When a module cannot be compiled.
+
+    Returns:
+        The names that were bundled, and the names that were left on disk.
+    """
+    bundle_path = pathlib.Path(bundle_path)
+    bundled: dict[str, pathlib.Path] = {}
+    kept: list[str] = []
+
+    for source in map(pathlib.Path, sources):
+        if not source.is_dir():
+            continue
+        for entry in sorted(source.iterdir()):
+            if entry.name in _IGNORED_NAMES or entry.suffix in _IGNORED_SUFFIXES:
+                continue
+            name = entry.stem if entry.is_file() else entry.name
+            if name in bundled or not _is_bundleable(entry):
+                kept.append(entry.name)
+            else:
+                bundled[name] = entry
+
+    fd, temp_path = tempfile.mkstemp(
+        prefix=bundle_path.name, suffix=".tmp", dir=bundle_path.parent
+    )
+    os.close(fd)
+    try:
+        with zipfile.ZipFile(
+            temp_path, "w", zipfile.ZIP_STORED
+        ) as bundle_file, tempfile.TemporaryDirectory() as temp_dir:
+            bytecode_path = os.path.join(temp_dir, "module.pyc")
+            for entry in bundled.values():
+                if entry.is_file():
+                    paths = [entry]
+                else:
+                    paths = sorted(
+                        path
+                        for path in entry.rglob("*.py")
+                        if "__pycache__" not in path.parts
+                    )
+                for path in paths:
+                    arcname = path.relative_to(entry.parent).as_posix()
+                    _write_module(
+                        bundle_file, path, arcname, bundle_path, bytecode_path
+                    )
+        os.replace(temp_path, bundle_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    # The modules are only removed once the bundle is in place
+    for entry in bundled.values():
+        if entry.is_file():
+            entry.unlink()
+            cache_paths = [entry.with_suffix(".pyc")]
+            cache_paths += entry.parent.glob(f"__pycache__/{entry.stem}.*.pyc")
+            for cache_path in cache_paths:
+                if cache_path.exists():
+                    cache_path.unlink()
+        else:
+            shutil.rmtree(entry)
+
+    return sorted(bundled), kept
+
+
+def enabled() -> bool:
+    """Determines whether Python modules should be bundled, from rez-build's arguments
+    or the environment.
+
+    Returns:
+        True if Python modules should be bundled.
+    """
+    return build_flags.enabled(ENV_VAR)
+
+
+def _is_bundleable(entry: pathlib.Path) -> bool:
+    """Determines whether a top-level module or package can be imported from a zip.
+
+    Args:
+        entry: The module's file or the package's directory.
+
+    Returns:
+        True if the entry only contains Python files.
+    """
+    if entry.is_file():
+        return entry.suffix == ".py" and entry.stem not in _KEEP_ON_DISK
+
+    if not entry.joinpath("__init__.py").is_file():
+        return False
+
+    for path in entry.rglob("*"):
+        if path.is_dir() or _IGNORED_NAMES.intersection(path.parts):
+            continue
+        if path.suffix != ".py" and path.suffix not in _IGNORED_SUFFIXES:
+            return False
+    return True
+
+
+def _write_module(
+    bundle_file: zipfile.ZipFile,
+    path: pathlib.Path,
+    arcname: str,
+    bundle_path: pathlib.Path,
+    bytecode_path: str,
+) -> None:
+    """Writes a module's source and bytecode to a bundle. The bytecode isn't checked
+    against the source, so zipimport uses it as is.
+
+    Args:
+        bundle_file: The bundle being written.
+        path: The module's source.
+        arcname: The module's path inside the bundle.
+        bundle_path: The bundle's final path, which tracebacks refer to.
+        bytecode_path: A temporary file to compile the module to.
+
+    Raises:
+        py_compile.PyCompileError: When the module cannot be compiled.
+    """
+    py_compile.compile(
+        str(path),
+        cfile=bytecode_path,
+        dfile=os.path.join(bundle_path, arcname),
+        doraise=True,
+        invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+    )
+    bundle_file.write(bytecode_path, arcname + "c")
+    bundle_file.write(path, arcname)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("bundle", help="The zip to write")
+    parser.add_argument("sources", nargs="+", help="The directories to bundle")
+    args = parser.parse_args()
+
+    bundled, kept = bundle(args.bundle, args.sources)
+    print(f"Bundled into {args.bundle}: {', '.join(bundled) or 'nothing'}")
+    if kept:
+        print(f"Left on disk: {', '.join(kept)}")
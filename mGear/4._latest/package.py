@@ -1,4 +1,7 @@
+import lockfiles
 import maya_packaging
+import metadata_client
+import zip_bundles
 
 
 name = "mGear"
@@ -10,6 +13,8 @@ authors = ["Robert Zhou"]
 def commands():
     env.MAYA_MODULE_PATH.append("{root}")
     env.MGEAR_MODULE_PATH = "{root}"
+    if this._zip_bundle:
+        env.PYTHONPATH.append("{root}/python.zip")
 
 
 description = "Open source rigging and animation framework for Autodesk Maya."
@@ -41,7 +46,7 @@ def variants():
             "platform-**",
             "arch-**",
             "maya-*",
-            f"python-{this.__python_version.rpartition('.')[0]}",
+            maya_packaging.get_python_requirement(this.__python_version),
             __PySide_module,
         ]
     ]
@@ -49,12 +54,33 @@ def variants():
 
 @early()
 def version():
-    import json
+    return lockfiles.get("version", _find_latest_release)
+
+
+@early()
+def _zip_bundle() -> bool:
+    """Caches whether the Python modules were bundled into a zip when building.
+
+    Returns:
+        True if the Python modules are bundled.
+    """
+    return zip_bundles.enabled()
+
+
+def _find_latest_release() -> str:
+    """Determines the version of mGear's latest regular release.
+
+    Raises:
+        InvalidPackageError: When no regular release can be found.
+
+    Returns:
+        The version.
+    """
     import re
-    from urllib.request import urlopen
 
-    with urlopen("https://api.github.com/repos/mgear-dev/mgear4/releases") as response:
-        release_data = json.load(response)
+    release_data = metadata_client.fetch_json(
+        "https://api.github.com/repos/mgear-dev/mgear4/releases"
+    )
 
     valid_release_pattern = re.compile(r"\d+\.\d+\.\d+$")
     latest_release = None
@@ -79,6 +105,12 @@ def version():
     return latest_release["tag_name"]
 
 
-__maya_bin_path = maya_packaging.get_bin_path()
-__PySide_module = maya_packaging.get_PySide_module(cached_bin_path=__maya_bin_path)
-__python_version = maya_packaging.get_python_version(cached_bin_path=__maya_bin_path)
+__maya_bin_path = lockfiles.get("__maya_bin_path", maya_packaging.get_bin_path)
+__PySide_module = lockfiles.get(
+    "__PySide_module",
+    lambda: maya_packaging.get_PySide_module(cached_bin_path=__maya_bin_path),
+)
+__python_version = lockfiles.get(
+    "__python_version",
+    lambda: maya_packaging.get_python_version(cached_bin_path=__maya_bin_path),
+)
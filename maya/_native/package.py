@@ -1,4 +1,6 @@
+import lockfiles
 import maya_packaging
+import tool_discovery
 
 
 name = "maya"
@@ -31,26 +33,11 @@ has_plugins = True
 
 @early()
 def requires():
-    requires = []
-
-    python_version = maya_packaging.get_python_version(cached_bin_path=this._bin_path)
-    requires.append(f"~python-{python_version}-_maya")
-
-    Qt_version = maya_packaging.get_Qt_version(cached_bin_path=this._bin_path)
-    requires.append(f"~Qt-{Qt_version}-_maya")
-
-    PySide_module = maya_packaging.get_PySide_module(cached_bin_path=this._bin_path)
-    PySide_version = maya_packaging.get_PySide_version(
-        PySide_module, cached_bin_path=this._bin_path
-    )
-    requires.append(f"~{PySide_module}-{PySide_version}-_maya")
-
-    return requires
+    return lockfiles.get("requires", _requires, this.__selected_year)
 
 
 @early()
 def tools():
-    import pathlib
     from rez.system import system
 
     potential_tools = [
@@ -83,16 +70,12 @@ def tools():
     potential_tools.append("maya")
 
     # Filter for tools that actually exist
-    bin_path = pathlib.Path(this._bin_path)
     suffix = ".exe" if system.platform == "windows" else ""
-
-    tools_ = []
-    for tool in potential_tools:
-        test_path = bin_path.joinpath(tool).with_suffix(suffix)
-        if test_path.is_file():
-            tools_.append(tool)
-
-    return tools_
+    return lockfiles.get(
+        "tools",
+        lambda: tool_discovery.find_tools(this._bin_path, potential_tools, suffix),
+        this.__selected_year,
+    )
 
 
 uuid = "recipes.maya"
@@ -109,6 +92,50 @@ def version():
 _native = True
 
 
+def __select_year() -> str | None:
+    """Determines the year of the Maya installation to package, which can be selected
+    with the MAYA_YEAR CMake variable.
+
+    Returns:
+        The year, or None to package the highest installed year.
+    """
+    import re
+    import sys
+
+    year = None
+    variable_pattern = re.compile(r"-DMAYA_YEAR(:\w+)?=(.*)")
+    for arg in sys.argv:
+        match = variable_pattern.search(arg)
+        if match:
+            year = match.group(2) or year
+
+    return year
+
+
+def _requires() -> list[str]:
+    """Determines the packages that Maya's internal Python and Qt installations are
+    provided by.
+
+    Returns:
+        The requirements.
+    """
+    requires = []
+
+    python_version = maya_packaging.get_python_version(cached_bin_path=_bin_path)
+    requires.append(f"~python-{python_version}-_maya")
+
+    Qt_version = maya_packaging.get_Qt_version(cached_bin_path=_bin_path)
+    requires.append(f"~Qt-{Qt_version}-_maya")
+
+    PySide_module = maya_packaging.get_PySide_module(cached_bin_path=_bin_path)
+    PySide_version = maya_packaging.get_PySide_version(
+        PySide_module, cached_bin_path=_bin_path
+    )
+    requires.append(f"~{PySide_module}-{PySide_version}-_maya")
+
+    return requires
+
+
 def _version() -> str:
     """Determines Maya's version string.
 
@@ -131,5 +158,8 @@ def _version() -> str:
     return out.rpartition("\n")[2]
 
 
-_bin_path = maya_packaging.get_bin_path()
-__version = _version()
+__selected_year = __select_year()
+_bin_path = lockfiles.get(
+    "_bin_path", lambda: maya_packaging.get_bin_path(__selected_year), __selected_year
+)
+__version = lockfiles.get("__version", _version, __selected_year)
@@ -1,4 +1,7 @@
+import lockfiles
 import maya_packaging
+import metadata_client
+import zip_bundles
 
 
 name = "ngSkinTools"
@@ -9,6 +12,8 @@ authors = ["Robert Zhou"]
 
 def commands():
     env.MAYA_PACKAGE_PATH.append("{root}")
+    if this._zip_bundle:
+        env.PYTHONPATH.append("{root}/python.zip")
 
 
 description = (
@@ -38,15 +43,7 @@ def pre_build_commands():
 
 @early()
 def requires():
-    import re
-    from urllib.request import urlopen
-
-    with urlopen(f"https://www.ngskintools.com/releases/v2/{__version}/") as response:
-        html = response.read()
-
-    years = re.findall(r"Maya (\d{4})", str(html))
-    years = "|".join(years)
-    return [f"maya-{years}"]
+    return lockfiles.get("requires", _requires)
 
 
 uuid = "recipes.ngskintools"
@@ -58,7 +55,7 @@ def variants():
         [
             "platform-**",
             "maya-*",
-            f"python-{this.__python_version.rpartition('.')[0]}",
+            maya_packaging.get_python_requirement(this.__python_version),
         ]
     ]
 
@@ -68,6 +65,33 @@ def version():
     return __version
 
 
+@early()
+def _zip_bundle() -> bool:
+    """Caches whether the Python modules were bundled into a zip when building.
+
+    Returns:
+        True if the Python modules are bundled.
+    """
+    return zip_bundles.enabled()
+
+
+def _requires() -> list[str]:
+    """Determines the Maya years supported by the release from its release page.
+
+    Returns:
+        The requirements.
+    """
+    import re
+
+    html = metadata_client.fetch_text(
+        f"https://www.ngskintools.com/releases/v2/{__version}/"
+    )
+
+    years = re.findall(r"Maya (\d{4})", html)
+    years = "|".join(years)
+    return [f"maya-{years}"]
+
+
 def _version() -> str:
     """Finds the latest v2 release available.
 
@@ -75,14 +99,16 @@ def _version() -> str:
         The version.
     """
     import re
-    from urllib.request import urlopen
 
-    with urlopen("https://www.ngskintools.com/releases/v2/") as response:
-        html = response.read()
+    html = metadata_client.fetch_text("https://www.ngskintools.com/releases/v2/")
+
+    match = re.search(r"releases/v2/(2\.\d+\.\d+)/", html)
+    version = match.group(1)
 
-    match = re.search(r"releases/v2/(2\.\d+\.\d+)/", str(html))
-    return match.group(1)
+    # Start fetching the release page needed by requires() while Maya is probed
+    metadata_client.prefetch([f"https://www.ngskintools.com/releases/v2/{version}/"])
+    return version
 
 
-__python_version = maya_packaging.get_python_version()
-__version = _version()
+__version = lockfiles.get("__version", _version)
+__python_version = lockfiles.get("__python_version", maya_packaging.get_python_version)
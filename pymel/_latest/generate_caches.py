@@ -0,0 +1,82 @@
+"""Generates pymel's API and command caches inside an installation of pymel.
+
+Without these caches, the first import of pymel in an environment parses Maya's API
+and command documentation, which takes many seconds. pymel reads its caches from the
+cache directory inside its own package, so generating them into the installation
+makes them available to every environment using it, even when the installation is
+read-only.
+
+Run with the mayapy of the Maya version to generate the caches for::
+
+    mayapy generate_caches.py PREFIX
+
+As this runs with Maya's own interpreter, it remains compatible with Python 3.7.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import sys
+import sysconfig
+
+
+# The caches that pymel builds on import, which are suffixed with Maya's version
+CACHE_NAMES = ("mayaApi", "mayaCmdsList")
+
+
+def generate_caches(prefix: str | os.PathLike) -> list[pathlib.Path]:
+    """Generates the caches for the running Maya version by importing pymel, which
+    builds and saves any caches that are missing.
+
+    Args:
+        prefix: The prefix that pymel was installed into with ``pip --prefix``.
+
+    Raises:
+        RuntimeError: When a cache wasn't generated inside the installation.
+
+    Returns:
+        The generated caches.
+    """
+    site_path = sysconfig.get_path(
+        "purelib", vars={"base": os.fspath(prefix), "platbase": os.fspath(prefix)}
+    )
+    sys.path.insert(0, site_path)
+
+    # The caches should only describe Maya itself
+    os.environ["MAYA_SKIP_USERSETUP_PY"] = "1"
+
+    import maya.standalone
+
+    maya.standalone.initialize()
+    try:
+        import pymel
+
+        # Importing pymel.core builds and saves any missing caches
+        import pymel.core
+        from pymel import versions
+
+        pymel_path = pathlib.Path(pymel.__file__).parent
+        if os.path.commonpath([pymel_path, site_path]) != os.path.normpath(site_path):
+            raise RuntimeError(f"pymel was not imported from {site_path}: {pymel_path}")
+
+        caches = []
+        for cache_name in CACHE_NAMES:
+            cache_pattern = cache_name + versions.shortName() + "*"
+            cache_paths = sorted(pymel_path.joinpath("cache").glob(cache_pattern))
+            if not cache_paths:
+                raise RuntimeError(f"pymel did not generate its {cache_name} cache")
+            caches += cache_paths
+    finally:
+        maya.standalone.uninitialize()
+
+    return caches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.partition("\n")[0])
+    parser.add_argument("prefix", help="The prefix that pymel was installed into")
+    args = parser.parse_args()
+
+    for cache_path in generate_caches(args.prefix):
+        print(f"Generated {cache_path}")
@@ -1,6 +1,9 @@
 import pathlib
 
+import lockfiles
 import maya_packaging
+import metadata_client
+import zip_bundles
 
 
 name = "pymel"
@@ -11,6 +14,8 @@ authors = ["Robert Zhou"]
 
 def commands():
     env.PATH.append("{root}/bin")
+    if this._zip_bundle:
+        env.PYTHONPATH.append("{root}/python.zip")
     env.PYTHONPATH.append("{root}/{this._site_path}")
 
 
@@ -31,17 +36,12 @@ uuid = "recipes.pymel"
 
 @early()
 def variants():
-    return [[f"python-{this.__python_version.rpartition('.')[0]}"]]
+    return [[maya_packaging.get_python_requirement(this.__python_version)]]
 
 
 @early()
 def version():
-    from rez.package_py_utils import exec_command
-
-    out, err = exec_command(
-        "version", [__mayapy_path, "-m", "pip", "index", "versions", "pymel"]
-    )
-    return out.partition("(")[2].partition(")")[0]
+    return lockfiles.get("version", _find_latest_release)
 
 
 @early()
@@ -58,8 +58,65 @@ def _site_path() -> str:
     )
 
 
-__maya_package = maya_packaging.latest_existing_package()
-__mayapy_path = str(pathlib.Path(__maya_package._bin_path, "mayapy"))
-__python_version = maya_packaging.get_python_version(
-    cached_bin_path=__maya_package._bin_path
+@early()
+def _zip_bundle() -> bool:
+    """Caches whether the Python modules were bundled into a zip when building.
+
+    Returns:
+        True if the Python modules are bundled.
+    """
+    return zip_bundles.enabled()
+
+
+def _find_latest_release() -> str:
+    """Determines the latest final release of pymel that supports Maya's Python
+    version.
+
+    Raises:
+        InvalidPackageError: When no such release can be found.
+
+    Returns:
+        The version.
+    """
+    from rez.exceptions import InvalidPackageError
+    from rez.vendor.packaging.specifiers import InvalidSpecifier, SpecifierSet
+    from rez.vendor.packaging.version import InvalidVersion, Version
+
+    # Like pip, find the latest final release that supports Maya's Python version
+    release_data = metadata_client.fetch_json("https://pypi.org/pypi/pymel/json")
+
+    latest_version = None
+    for version_string, files in release_data["releases"].items():
+        try:
+            version_ = Version(version_string)
+        except InvalidVersion:
+            continue
+        if version_.is_prerelease or (latest_version and version_ <= latest_version):
+            continue
+
+        for file_ in files:
+            if file_.get("yanked"):
+                continue
+            try:
+                requires_python = SpecifierSet(file_.get("requires_python") or "")
+            except InvalidSpecifier:
+                continue
+            if __python_version in requires_python:
+                latest_version = version_
+                break
+
+    if not latest_version:
+        raise InvalidPackageError(
+            f"Could not find a pymel release for Python {__python_version}"
+        )
+
+    return str(latest_version)
+
+
+__maya_bin_path = lockfiles.get(
+    "__maya_bin_path", lambda: maya_packaging.latest_existing_package()._bin_path
+)
+__python_version = lockfiles.get(
+    "__python_version",
+    lambda: maya_packaging.get_python_version(cached_bin_path=__maya_bin_path),
 )
@@ -1,3 +1,4 @@
+import lockfiles
 import maya_packaging
 
 
@@ -34,16 +35,16 @@ _native = True
 @early()
 def _site_paths():
     """See `rez.package_py_utils.find_site_python <https://rez.readthedocs.io/en/stable/api/rez.package_py_utils.html#rez.package_py_utils.find_site_python>`_."""
-    import ast
-
-    paths_literal = maya_packaging.exec_mayapy(
+    return lockfiles.get(
         "_site_paths",
-        ["import site", "print(site.getsitepackages())"],
-        cached_bin_path=__maya_package._bin_path,
-        initialize=False,
+        lambda: maya_packaging.get_site_paths(cached_bin_path=__maya_bin_path),
     )
-    return ast.literal_eval(paths_literal)
 
 
-__maya_package = maya_packaging.latest_existing_package()
-__version = maya_packaging.get_python_version(cached_bin_path=__maya_package._bin_path)
+__maya_bin_path = lockfiles.get(
+    "__maya_bin_path", lambda: maya_packaging.latest_existing_package()._bin_path
+)
+__version = lockfiles.get(
+    "__version",
+    lambda: maya_packaging.get_python_version(cached_bin_path=__maya_bin_path),
+)
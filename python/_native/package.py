@@ -1,3 +1,9 @@
+import lockfiles
+import pacman
+import python_packaging
+import tool_discovery
+
+
 name = "python"
 
 
@@ -28,10 +34,14 @@ external = True
 
 @early()
 def tools():
-    return (
-        _generate_tools_from_pacman()
-        or _generate_tools_from_bin_path()
-        or _generate_default_tools()
+    return lockfiles.get(
+        "tools",
+        lambda: (
+            _generate_tools_from_pacman()
+            or _generate_tools_from_bin_path()
+            or _generate_default_tools()
+        ),
+        this.__selected_executable,
     )
 
 
@@ -49,54 +59,37 @@ def version():
 _native = True
 
 
-def __bin_path() -> str:
-    """Determines Python's binaries path.
+def __probe_interpreter() -> dict:
+    """Determines Python's binaries path, version and site paths with a single
+    interpreter launch, which is skipped entirely when the result is cached.
 
     Returns:
-        The path.
+        The probed values.
     """
-    import pathlib
-    import re
-    import sys
-    from rez.package_py_utils import exec_python
-
-    executable = ""
-    variable_pattern = re.compile(r"-DEXECUTABLE(:\w+)?=(.*)")
-    for arg in sys.argv:
-        match = variable_pattern.search(arg)
-        if match:
-            executable = match.group(2) or executable
-
-    kwargs = {}
-    if executable:
-        kwargs["executable"] = executable
-
-    return exec_python(
-        "_bin_path",
-        ["import pathlib", "import sys", "print(pathlib.Path(sys.executable).parent)"],
-        **kwargs,
-    )
+    return python_packaging.probe_interpreter(__selected_executable or "python")
 
 
 @early()
 def _cmake_path() -> str | None:
     """Determines Python's CMake module path.
 
+    Returns:
+        The path, if found.
+    """
+    return lockfiles.get("_cmake_path", _find_cmake_path)
+
+
+def _find_cmake_path() -> str | None:
+    """Searches pacman's file list for Python's CMake module path.
+
     Returns:
         The path, if found.
     """
     import pathlib
-    from rez.package_py_utils import exec_command
-
-    try:
-        out, err = exec_command("_cmake_path", ["pacman", "--query", "--list", "cmake"])
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("FindPython.cmake"):
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
+
+    for path in pacman.list_files("cmake") or []:
+        if path.endswith("FindPython.cmake"):
+            return str(pathlib.Path(path).parent)
 
     return None
 
@@ -130,15 +123,15 @@ def _generate_tools_from_bin_path() -> list[str]:
     Returns:
         The tool names, if any were found.
     """
-    from itertools import chain
     import pathlib
 
     install_root = pathlib.Path(_bin_path)
     tools_: list[str] = []
-    for tool in chain(
-        install_root.glob("*.exe"), install_root.joinpath("Scripts").glob("*.exe")
-    ):
-        tools_.append(tool.stem)
+    for directory in (install_root, install_root.joinpath("Scripts")):
+        for file_name in sorted(tool_discovery.list_files(directory)):
+            file_path = pathlib.PurePath(file_name)
+            if file_path.suffix.lower() == ".exe":
+                tools_.append(file_path.stem)
     return tools_
 
 
@@ -148,17 +141,14 @@ def _generate_tools_from_pacman() -> list[str] | None:
     Returns:
         The tool names, if any were found.
     """
-    from rez.package_py_utils import exec_command
+    paths = pacman.list_files("python")
+    if paths is None:
+        return None
 
     tools_: list[str] = []
 
-    try:
-        out, err = exec_command("tools", ["pacman", "--query", "--list", "python"])
-    except FileNotFoundError:
-        return None
-
-    for path in out.split("\n"):
-        if not path.startswith("python /usr/bin"):
+    for path in paths:
+        if not path.startswith("/usr/bin"):
             continue
         tool = path.rpartition("/")[2]
         if tool:
@@ -170,33 +160,30 @@ def _generate_tools_from_pacman() -> list[str] | None:
 @early()
 def _site_paths():
     """See `rez.package_py_utils.find_site_python <https://rez.readthedocs.io/en/stable/api/rez.package_py_utils.html#rez.package_py_utils.find_site_python>`_."""
-    import ast
-    import pathlib
-    from rez.package_py_utils import exec_python
+    return __probe["site_paths"]
 
-    paths_literal = exec_python(
-        "_site_paths",
-        ["import site", "print(site.getsitepackages())"],
-        executable=str(pathlib.Path(_bin_path, "python")),
-    )
-    return ast.literal_eval(paths_literal)
 
-
-def _version() -> str:
-    """Determines Python's version string.
+def __select_executable() -> str | None:
+    """Determines the Python interpreter to package, which can be selected with the
+    EXECUTABLE CMake variable.
 
     Returns:
-        The version.
+        The interpreter, or None to package the ``python`` on the PATH.
     """
-    import pathlib
-    from rez.package_py_utils import exec_python
+    import re
+    import sys
 
-    return exec_python(
-        "version",
-        ["import platform", "print(platform.python_version())"],
-        executable=str(pathlib.Path(_bin_path, "python")),
-    )
+    executable = None
+    variable_pattern = re.compile(r"-DEXECUTABLE(:\w+)?=(.*)")
+    for arg in sys.argv:
+        match = variable_pattern.search(arg)
+        if match:
+            executable = match.group(2) or executable
+
+    return executable
 
 
-_bin_path = __bin_path()
-__version = _version()
+__selected_executable = __select_executable()
+__probe = lockfiles.get("__probe", __probe_interpreter, __selected_executable)
+_bin_path = __probe["bin_path"]
+__version = __probe["version"]
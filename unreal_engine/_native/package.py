@@ -1,3 +1,8 @@
+import lockfiles
+import tool_discovery
+import unreal_packaging
+
+
 name = "unreal_engine"
 
 
@@ -24,20 +29,7 @@ has_plugins = True
 
 @early()
 def tools():
-    import pathlib
-    from rez.system import system
-
-    bin_path = pathlib.Path(this._bin_path)
-    suffix = ".exe" if system.platform == "windows" else ""
-
-    tools_ = []
-    for child in bin_path.glob("*"):
-        if not child.is_file():
-            continue
-        if suffix == child.suffix:
-            tools_.append(child.stem)
-
-    return tools_
+    return lockfiles.get("tools", _tools, this.__selected_version)
 
 
 uuid = "recipes.unreal_engine"
@@ -48,144 +40,68 @@ variants = [["platform-**", "arch-**", "os-**"]]
 
 @early()
 def version():
-    version_ = _get_version_from_bin_path() or _get_version_from_pacman()
-
-    if not version_:
-        from rez.exceptions import InvalidPackageError
-
-        raise InvalidPackageError("Could not determine Unreal Engine's version string")
-
-    return version_ + "-native"
+    return __installation["version"] + "-native"
 
 
 _native = True
 
 
-def __bin_path() -> str:
-    """Determines Unreal Engine's binaries path.
+def __find_installation() -> dict[str, str]:
+    """Determines the Unreal Engine installation to package.
 
     Raises:
-        InvalidPackageError: When the bin path cannot be determined.
+        InvalidPackageError: When the installation cannot be determined.
 
     Returns:
-        The path.
+        The installation's version and bin path.
     """
-    path = _get_bin_path_from_pacman() or _get_bin_path_from_winreg()
-
-    if not path:
-        from rez.exceptions import InvalidPackageError
+    import dataclasses
 
-        raise InvalidPackageError("Could not determine Unreal Engine's bin path")
+    return dataclasses.asdict(unreal_packaging.get_installation(__selected_version))
 
-    return path
 
-
-def _get_bin_path_from_pacman() -> str | None:
-    """Determines Unreal Engine's binaries path from the pacman package manager.
+def __select_version() -> str | None:
+    """Determines the version of the Unreal Engine installation to package, which can
+    be selected with the UNREAL_ENGINE_VERSION CMake variable.
 
     Returns:
-        The path, if found.
+        The version, or None to package the highest installed version.
     """
-    import pathlib
-    from rez.package_py_utils import exec_command
-
-    try:
-        out, err = exec_command(
-            "bin_path", ["pacman", "--query", "--list", "unreal-engine"]
-        )
-    except FileNotFoundError:
-        pass
-    else:
-        for path in out.split("\n"):
-            if path.endswith("UnrealEditor") and "Saved" not in path:
-                path = path.partition(" ")[2]
-                return str(pathlib.Path(path).parent)
-
-    return None
-
-
-def _get_bin_path_from_winreg() -> str | None:
-    """Determines Unreal Engine's binaries path from the Windows registry.
-
-    Returns:
-        The path, if found.
-    """
-    import pathlib
     import re
+    import sys
 
-    try:
-        import winreg
-    except ModuleNotFoundError:
-        return None
-
-    version_pattern = re.compile(r"^\d+\.\d+$")
-
-    with winreg.OpenKey(
-        winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\EpicGames\Unreal Engine"
-    ) as ue_key:
-        # Iterate through the sub-keys to determine the highest installed version
-        key_count, _, _ = winreg.QueryInfoKey(ue_key)
-        max_version = ""
-        for index in range(key_count):
-            version = winreg.EnumKey(ue_key, index)
-            if version_pattern.match(version) and version > max_version:
-                max_version = version
+    version_ = None
+    variable_pattern = re.compile(r"-DUNREAL_ENGINE_VERSION(:\w+)?=(.*)")
+    for arg in sys.argv:
+        match = variable_pattern.search(arg)
+        if match:
+            version_ = match.group(2) or version_
 
-        if not max_version:
-            return None
+    return version_
 
-        with winreg.OpenKey(ue_key, max_version) as version_key:
-            value, _ = winreg.QueryValueEx(version_key, "InstalledDirectory")
 
-    return str(pathlib.Path(value, "Engine", "Binaries", "Win64"))
-
-
-def _get_version_from_bin_path() -> str | None:
-    """Determines Unreal Engine's version from the version data in the bin path.
+def _tools() -> list[str]:
+    """Determines the executables in the engine's bin path.
 
     Returns:
-        The version, if found.
+        The tool names.
     """
-    import json
     import pathlib
+    from rez.system import system
 
-    version_path = pathlib.Path(_bin_path).joinpath("UnrealEditor.version")
-    if not version_path.exists():
-        return None
-
-    with open(version_path) as version_file:
-        version_data = json.load(version_file)
-
-    return ".".join(
-        (
-            str(version_data["MajorVersion"]),
-            str(version_data["MinorVersion"]),
-            str(version_data["PatchVersion"]),
-        )
-    )
-
-
-def _get_version_from_pacman() -> str | None:
-    """Determines Unreal Engine's version from the pacman package manager.
-
-    Returns:
-        The version, if found.
-    """
-    import re
-    from rez.package_py_utils import exec_command
+    suffix = ".exe" if system.platform == "windows" else ""
 
-    try:
-        out, err = exec_command(
-            "version", ["pacman", "--query", "--info", "unreal-engine"]
-        )
-    except FileNotFoundError:
-        pass
-    else:
-        matches = re.search(r"Version[\s:]+(\d+\.\d+\.\d+)", out)
-        if matches:
-            return matches.groups(1)[0]
+    tools_ = []
+    for file_name in sorted(tool_discovery.list_files(_bin_path)):
+        file_path = pathlib.PurePath(file_name)
+        if suffix == file_path.suffix:
+            tools_.append(file_path.stem)
 
-    return None
+    return tools_
 
 
-_bin_path = __bin_path()
+__selected_version = __select_version()
+__installation = lockfiles.get(
+    "__installation", __find_installation, __selected_version
+)
+_bin_path = __installation["bin_path"]